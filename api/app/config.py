@@ -1,4 +1,5 @@
-from typing import List
+from decimal import Decimal
+from typing import List, Optional
 
 from pydantic import Field, SecretStr, HttpUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -10,9 +11,10 @@ class Settings(BaseSettings):
     debug: bool = True
     host: str = "127.0.0.1"
     port: int = 8000
+    api_v1_prefix: str = "/api/v1"
 
     # CORS
-    cors_origin: List[str] = ["*"]
+    cors_origins: List[str] = ["*"]
     
     # Security
     secret_key: str = "your-secret-key-change-in-production"
@@ -21,6 +23,30 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = Field(..., alias="DATABASE_URL")
+    db_pool_size: int = Field(default=20, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+
+    # Реплика для чтений (необязательно)
+    database_replica_url: Optional[str] = Field(
+        default=None,
+        alias="DATABASE_REPLICA_URL"
+    )
+    db_replica_pool_size: int = Field(default=20, alias="DB_REPLICA_POOL_SIZE")
+    db_replica_max_overflow: int = Field(default=10, alias="DB_REPLICA_MAX_OVERFLOW")
+    db_replica_max_lag_seconds: float = Field(
+        default=5.0,
+        alias="DB_REPLICA_MAX_LAG_SECONDS",
+        description="при большем отставании реплики чтения идут в основную БД"
+    )
+    db_replica_check_interval: float = Field(
+        default=5.0,
+        alias="DB_REPLICA_CHECK_INTERVAL"
+    )
+    db_statement_cache_size: int = Field(
+        default=500,
+        alias="DB_STATEMENT_CACHE_SIZE",
+        description="подготовленных запросов asyncpg на соединение"
+    )
     
     # API Tokens
     backend_api_token: str = Field(alias="BACKEND_API_TOKEN")
@@ -46,11 +72,166 @@ class Settings(BaseSettings):
         alias="ALFACRM_EMAIL",
         description="e-mail пользователя для авторизации в системе"
     )
+    alfacrm_telegram_field: str = Field(
+        default="1",
+        alias="ALFACRM_TELEGRAM_FIELD",
+        description="ключ кастомного поля клиента, в котором хранится \
+            telegram_id"
+    )
+
+    # AlfaCRM HTTP pool
+    alfacrm_max_connections: int = Field(
+        default=20,
+        alias="ALFACRM_MAX_CONNECTIONS",
+        description="максимальное количество одновременных соединений с AlfaCRM"
+    )
+    alfacrm_max_keepalive_connections: int = Field(
+        default=10,
+        alias="ALFACRM_MAX_KEEPALIVE_CONNECTIONS",
+        description="количество соединений, которые держатся открытыми \
+            между запросами"
+    )
+    alfacrm_keepalive_expiry: float = Field(
+        default=30.0,
+        alias="ALFACRM_KEEPALIVE_EXPIRY",
+        description="время (сек.), через которое простаивающее соединение \
+            закрывается"
+    )
+    alfacrm_connect_timeout: float = Field(
+        default=5.0,
+        alias="ALFACRM_CONNECT_TIMEOUT"
+    )
+    alfacrm_read_timeout: float = Field(
+        default=20.0,
+        alias="ALFACRM_READ_TIMEOUT"
+    )
+    alfacrm_retry_attempts: int = Field(
+        default=3,
+        alias="ALFACRM_RETRY_ATTEMPTS",
+        description="попыток для идемпотентных GET-запросов"
+    )
+    alfacrm_retry_base_delay: float = Field(
+        default=0.5,
+        alias="ALFACRM_RETRY_BASE_DELAY"
+    )
+    alfacrm_breaker_failure_threshold: int = Field(
+        default=5,
+        alias="ALFACRM_BREAKER_FAILURE_THRESHOLD",
+        description="ошибок подряд до размыкания цепи"
+    )
+    alfacrm_breaker_recovery_timeout: float = Field(
+        default=30.0,
+        alias="ALFACRM_BREAKER_RECOVERY_TIMEOUT",
+        description="через сколько секунд после размыкания пробовать снова"
+    )
+    alfacrm_rate_limit: float = Field(
+        default=5.0,
+        alias="ALFACRM_RATE_LIMIT",
+        description="запросов в секунду к AlfaCRM (снижается при 429)"
+    )
+    alfacrm_rate_burst: float = Field(
+        default=10.0,
+        alias="ALFACRM_RATE_BURST"
+    )
+    alfacrm_http2: bool = Field(
+        default=False,
+        alias="ALFACRM_HTTP2",
+        description="использовать HTTP/2 (нужен пакет h2)"
+    )
+
+    # AlfaCRM batch requests
+    alfacrm_batch_size: int = Field(
+        default=50,
+        alias="ALFACRM_BATCH_SIZE",
+        description="сколько id клиентов передается в одном запросе"
+    )
+    alfacrm_batch_concurrency: int = Field(
+        default=4,
+        alias="ALFACRM_BATCH_CONCURRENCY",
+        description="сколько пачек запрашивается одновременно"
+    )
+
+    # Cache (баланс и история операций)
+    cache_ttl_seconds: float = Field(
+        default=60,
+        alias="CACHE_TTL_SECONDS",
+        description="сколько секунд значение считается свежим"
+    )
+    cache_stale_ttl_seconds: float = Field(
+        default=900,
+        alias="CACHE_STALE_TTL_SECONDS",
+        description="сколько секунд после TTL значение еще отдается, \
+            пока в фоне идет обновление"
+    )
+    cache_max_size: int = Field(
+        default=10000,
+        alias="CACHE_MAX_SIZE",
+        description="максимальное количество записей в каждом кэше"
+    )
+
+    # CRM sync
+    crm_sync_concurrency: int = Field(
+        default=4,
+        alias="CRM_SYNC_CONCURRENCY",
+        description="сколько страниц AlfaCRM запрашивается одновременно"
+    )
+    crm_sync_page_size: int = Field(default=100, alias="CRM_SYNC_PAGE_SIZE")
+    crm_sync_min_page_size: int = Field(default=25, alias="CRM_SYNC_MIN_PAGE_SIZE")
+    crm_sync_max_page_size: int = Field(default=500, alias="CRM_SYNC_MAX_PAGE_SIZE")
+    crm_sync_target_page_latency: float = Field(
+        default=2.0,
+        alias="CRM_SYNC_TARGET_PAGE_LATENCY",
+        description="желаемое время (сек.) загрузки окна страниц, \
+            по нему подбирается размер страницы"
+    )
+    crm_sync_interval_minutes: float = Field(
+        default=15,
+        alias="CRM_SYNC_INTERVAL_MINUTES",
+        description="период инкрементальной синхронизации"
+    )
+    crm_full_resync_hours: float = Field(
+        default=24,
+        alias="CRM_FULL_RESYNC_HOURS",
+        description="не реже этого периода выполняется полная синхронизация"
+    )
+
+    # Финансовые сводки
+    cyberon_crm_type_prefix: str = Field(
+        default="bonus",
+        alias="CYBERON_CRM_TYPE_PREFIX",
+        description="транзакции AlfaCRM с таким префиксом типа считаются \
+            операциями с киберонами"
+    )
+
+    # Уведомления о низком балансе
+    alert_lessons_threshold: int = Field(
+        default=1,
+        alias="ALERT_LESSONS_THRESHOLD",
+        description="уведомлять, если оплаченных занятий не больше этого числа"
+    )
+    alert_balance_threshold: Decimal = Field(
+        default=Decimal("0"),
+        alias="ALERT_BALANCE_THRESHOLD",
+        description="уведомлять, если денежный баланс ниже этого значения"
+    )
 
     # Telegram
     telegram_bot_token: SecretStr = Field(..., alias="TELEGRAM_BOT_TOKEN")
     directors_chat_id: str = Field(..., alias="DIRECTORS_CHAT_ID")
 
+    # Outbox сообщений директору
+    outbox_batch_size: int = Field(default=20, alias="OUTBOX_BATCH_SIZE")
+    outbox_max_attempts: int = Field(
+        default=10,
+        alias="OUTBOX_MAX_ATTEMPTS",
+        description="после стольких неудачных попыток сообщение помечается failed"
+    )
+    outbox_poll_interval: float = Field(
+        default=5.0,
+        alias="OUTBOX_POLL_INTERVAL",
+        description="как часто воркер проверяет отложенные повторы"
+    )
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,31 +1,257 @@
+import asyncio
 import logging
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm import declarative_base
 
-from api.app.config import settings
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Создаем async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=20,       # Количество соединений, которые пул будет держать открытыми постоянно
-    max_overflow=10,    # Максимальное количество дополнительных соединений сверх pool_size
-    pool_pre_ping=True  # Проверка соединения перед использованием
+
+class PoolMetrics:
+    """
+    Время ожидания соединения из пула (включая установку нового соединения)
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.checkouts: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+        # Ожидания дольше 100 мс - признак того, что пулу не хватает соединений
+        self.slow_checkouts: int = 0
+
+    def observe(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if wait > 0.1:
+            self.slow_checkouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": round(
+                self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                2
+            ),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "slow_checkouts": self.slow_checkouts
+        }
+
+
+# Метрики по имени пула (logging_name сохраняется при пересоздании пула)
+POOL_METRICS: Dict[str, PoolMetrics] = {}
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self) -> Any:
+        started: float = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            metrics: Optional[PoolMetrics] = POOL_METRICS.get(self.logging_name)
+            if metrics is not None:
+                metrics.observe(time.monotonic() - started)
+
+
+def _connect_args(url: str) -> Dict[str, Any]:
+    # Подготовленные запросы кэшируются на соединении: повторяющиеся
+    # upsert и выборки не разбираются Postgres заново
+    if make_url(url).get_driver_name() == "asyncpg":
+        return {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    return {}
+
+
+def _create_engine(
+    name: str,
+    url: str,
+    pool_size: int,
+    max_overflow: int
+) -> AsyncEngine:
+    POOL_METRICS[name] = PoolMetrics(name)
+    return create_async_engine(
+        url,
+        echo=settings.debug,
+        poolclass=TimedQueuePool,
+        pool_logging_name=name,
+        pool_size=pool_size,        # Соединения, которые пул держит открытыми постоянно
+        max_overflow=max_overflow,  # Дополнительные соединения сверх pool_size
+        pool_pre_ping=True,         # Проверка соединения перед использованием
+        connect_args=_connect_args(url)
+    )
+
+
+def _sessionmaker(bind: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False
+    )
+
+
+# Основная БД: все записи и чтения, которым нужны только что записанные данные
+engine = _create_engine(
+    "primary",
+    settings.database_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow
 )
+AsyncSessionLocal = _sessionmaker(engine)
 
-# Создаем фабрику сессий
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False
+# Реплика для чтений бота, чтобы они не конкурировали с записью синхронизации
+replica_engine: Optional[AsyncEngine] = (
+    _create_engine(
+        "replica",
+        settings.database_replica_url,
+        pool_size=settings.db_replica_pool_size,
+        max_overflow=settings.db_replica_max_overflow
+    )
+    if settings.database_replica_url else None
+)
+ReplicaSessionLocal: Optional[async_sessionmaker] = (
+    _sessionmaker(replica_engine) if replica_engine is not None else None
 )
 
+# Отставание реплики: 0, если все полученные изменения уже применены
+PRIMARY_LSN_QUERY = text("SELECT pg_current_wal_lsn()::text")
+
+# Реплика догнала основную БД, если проиграла WAL до позиции, снятой
+# на основной перед проверкой. Иначе отставание - время с последней
+# проигранной транзакции. Без активного приемника WAL репликация
+# не идет, и совпадение позиций ничего не говорит о свежести данных
+REPLICA_STATE_QUERY = text("""
+SELECT
+    EXISTS (
+        SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'
+    ) AS streaming,
+    pg_last_wal_replay_lsn() >= CAST(:primary_lsn AS pg_lsn) AS caught_up,
+    EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) AS lag
+""")
+
+
+class ReplicaRouter:
+    """
+    Выбор БД для сессий только на чтение.
+
+    Пока отставание реплики не больше `max_lag` секунд, чтения идут на нее,
+    иначе (а также если реплика не настроена, недоступна или репликация
+    остановлена) - на основную БД. Отставание проверяется в фоне раз
+    в `check_interval` секунд
+    """
+
+    def __init__(self, max_lag: float, check_interval: float) -> None:
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.replica_sessions: int = 0
+        self.primary_fallbacks: int = 0
+
+    @property
+    def replica_usable(self) -> bool:
+        return (
+            ReplicaSessionLocal is not None and
+            self.lag is not None and
+            self.lag <= self.max_lag
+        )
+
+    def session(self) -> AsyncSession:
+        if self.replica_usable:
+            self.replica_sessions += 1
+            return ReplicaSessionLocal()
+        if ReplicaSessionLocal is not None:
+            self.primary_fallbacks += 1
+        return AsyncSessionLocal()
+
+    async def check_lag(self) -> None:
+        was_usable: bool = self.replica_usable
+        try:
+            self.lag = await self._measure_lag()
+        except Exception as e:
+            logger.error(f"Replica lag check failed: {e}")
+            self.lag = None
+
+        if was_usable != self.replica_usable:
+            state: str = "enabled" if self.replica_usable else "disabled"
+            logger.warning(f"Read replica {state} (lag: {self.lag})")
+
+    @staticmethod
+    async def _measure_lag() -> Optional[float]:
+        """
+        Отставание реплики в секундах (None - реплика непригодна)
+        """
+
+        async with engine.connect() as conn:
+            primary_lsn: str = (await conn.execute(PRIMARY_LSN_QUERY)).scalar_one()
+        async with replica_engine.connect() as conn:
+            state = (await conn.execute(
+                REPLICA_STATE_QUERY,
+                {"primary_lsn": primary_lsn}
+            )).one()
+
+        if not state.streaming:
+            return None
+        if state.caught_up:
+            return 0.0
+        return float(state.lag) if state.lag is not None else None
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_interval)
+
+    async def start(self) -> None:
+        if replica_engine is None or self._task is not None:
+            return
+        await self.check_lag()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if replica_engine is not None:
+            await replica_engine.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replica_configured": replica_engine is not None,
+            "replica_usable": self.replica_usable,
+            "replica_lag": self.lag,
+            "replica_sessions": self.replica_sessions,
+            "primary_fallbacks": self.primary_fallbacks
+        }
+
+
+replica_router = ReplicaRouter(
+    max_lag=settings.db_replica_max_lag_seconds,
+    check_interval=settings.db_replica_check_interval
+)
+
+# Фабрика сессий только на чтение (реплика или основная БД)
+ReadSessionLocal = replica_router.session
+
+
+def db_stats() -> Dict[str, Any]:
+    return {
+        "pools": {name: metrics.snapshot() for name, metrics in POOL_METRICS.items()},
+        "routing": replica_router.stats()
+    }
+
+
 Base = declarative_base()
 
 
@@ -50,6 +276,9 @@ async def create_tables():
     Создание таблиц в БД
     """
 
+    # Импорт регистрирует модели в Base.metadata
+    import models  # noqa: F401
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created")
@@ -1,14 +1,22 @@
+import asyncio
 import logging
 
-from fastapi import FastAPI, Depends, HTTPException, Security
+from fastapi import FastAPI, Depends, HTTPException, Request, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from routers import users, finance, admin, messages
-from services.alfacrm import AlfaCRMClient
+from app.db import create_tables, engine, replica_router
+from routers import users, finance, admin, alerts, messages
+from services import jsonlib
+from services.alfacrm import alfacrm_client
+from services.analytics import finance_rollups
+from services.outbox import director_outbox
+from services.rules import rules_service
+from services.sync import run_periodic_sync
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,14 +28,32 @@ security = HTTPBearer()
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up...")
-    yield
-    # Shutdown
-    logger.info("Shutting down...")
+    await create_tables()
+    await finance_rollups.ensure()
+    await replica_router.start()
+    await rules_service.load_version()
+    await alfacrm_client.start()
+    await director_outbox.start()
+    sync_task = asyncio.create_task(run_periodic_sync())
+    try:
+        yield
+    finally:
+        # Shutdown
+        logger.info("Shutting down...")
+        sync_task.cancel()
+        await director_outbox.close()
+        await alfacrm_client.close()
+        await replica_router.close()
+        await engine.dispose()
 
 
 app = FastAPI(
     title=settings.app_name,
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson сериализует ответы заметно быстрее стандартного json
+    default_response_class=(
+        ORJSONResponse if jsonlib.orjson is not None else JSONResponse
+    )
 )
 
 # CORS
@@ -40,6 +66,14 @@ app.add_middleware(
 )
 
 
+# Версия правил в каждом ответе - бот по ней сбрасывает кэш правил
+@app.middleware("http")
+async def add_rules_version(request: Request, call_next):
+    response = await call_next(request)
+    response.headers["X-Rules-Version"] = rules_service.version
+    return response
+
+
 # Dependency для проверки токена
 async def verify_token(
     credentials: HTTPAuthorizationCredentials = Security(security)
@@ -79,6 +113,11 @@ app.include_router(
     prefix=settings.api_v1_prefix,
     dependencies=[Depends(verify_token)]
 )
+app.include_router(
+    alerts.router,
+    prefix=settings.api_v1_prefix,
+    dependencies=[Depends(verify_token)]
+)
 app.include_router(
     messages.router,
     prefix=settings.api_v1_prefix,
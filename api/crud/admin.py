@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import upsert_rows
+from models.admin import Rule
+
+
+async def get_rule(session: AsyncSession, kind: str) -> Optional[Rule]:
+    result = await session.execute(select(Rule).where(Rule.kind == kind))
+    return result.scalar_one_or_none()
+
+
+async def get_rules(session: AsyncSession) -> List[Rule]:
+    result = await session.execute(select(Rule))
+    return list(result.scalars())
+
+
+async def save_rule(session: AsyncSession, kind: str, text: str) -> Rule:
+    await upsert_rows(session, Rule, [{"kind": kind, "text": text}], ["kind"])
+    await session.flush()
+    rule = await get_rule(session, kind)
+    await session.refresh(rule)
+    return rule
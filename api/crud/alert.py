@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from sqlalchemy import and_, delete, literal, not_, or_, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.alert import BalanceAlert
+from models.user import Customer, TelegramLink
+
+
+def _alert_conditions(
+    lessons_threshold: int,
+    balance_threshold: Decimal
+) -> Dict[str, Any]:
+    return {
+        "low_lessons": Customer.paid_lessons <= lessons_threshold,
+        "negative_balance": Customer.balance < balance_threshold
+    }
+
+
+async def detect_balance_alerts(
+    session: AsyncSession,
+    lessons_threshold: int,
+    balance_threshold: Decimal
+) -> int:
+    """
+    Один проход по локальной копии клиентов: снять уведомления с тех,
+    кто вернулся выше порога, и поставить новые тем, кто опустился ниже.
+    Возвращает количество новых уведомлений
+    """
+
+    conditions = _alert_conditions(lessons_threshold, balance_threshold)
+
+    # Пополнившие баланс: следующее пересечение порога снова даст уведомление
+    still_low = or_(*(
+        and_(BalanceAlert.kind == kind, condition)
+        for kind, condition in conditions.items()
+    ))
+    await session.execute(
+        delete(BalanceAlert).where(
+            not_(
+                select(Customer.id)
+                .where(Customer.id == BalanceAlert.customer_id, still_low)
+                .exists()
+            )
+        )
+    )
+
+    candidates = union_all(*(
+        select(
+            Customer.id.label("customer_id"),
+            TelegramLink.telegram_id.label("telegram_id"),
+            literal(kind).label("kind")
+        )
+        .join(TelegramLink, TelegramLink.customer_id == Customer.id)
+        .where(condition)
+        for kind, condition in conditions.items()
+    ))
+    result = await session.execute(
+        insert(BalanceAlert)
+        .from_select(["customer_id", "telegram_id", "kind"], candidates)
+        .on_conflict_do_nothing(
+            index_elements=["customer_id", "telegram_id", "kind"]
+        )
+    )
+    return result.rowcount
+
+
+async def get_pending_alerts(
+    session: AsyncSession,
+    limit: int
+) -> List[Dict[str, Any]]:
+    result = await session.execute(
+        select(
+            BalanceAlert.id,
+            BalanceAlert.telegram_id,
+            BalanceAlert.kind,
+            Customer.name,
+            Customer.balance,
+            Customer.paid_lessons
+        )
+        .join(Customer, Customer.id == BalanceAlert.customer_id)
+        .where(BalanceAlert.sent_at.is_(None))
+        .order_by(BalanceAlert.id)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in result]
+
+
+async def mark_alerts_sent(session: AsyncSession, ids: List[int]) -> int:
+    if not ids:
+        return 0
+
+    result = await session.execute(
+        update(BalanceAlert)
+        .where(BalanceAlert.id.in_(ids), BalanceAlert.sent_at.is_(None))
+        .values(sent_at=datetime.now(timezone.utc))
+    )
+    return result.rowcount
@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Postgres ограничивает количество параметров запроса (32767),
+# поэтому большие вставки режутся на пачки
+DEFAULT_BATCH_SIZE = 1000
+
+# Начиная с такого объема строки загружаются через COPY во временную
+# таблицу и сливаются одним INSERT ... SELECT. Окна полной синхронизации
+# идут через COPY при любом размере (bulk=True)
+COPY_THRESHOLD = 2000
+
+
+def chunked(rows: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def upsert_rows(
+    session: AsyncSession,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: List[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    bulk: bool = False
+) -> int:
+    """
+    Многострочный INSERT ... ON CONFLICT DO UPDATE пачками.
+    Полные пачки дают одинаковый SQL, поэтому asyncpg переиспользует
+    подготовленный запрос. Большие объемы и массовая загрузка (bulk)
+    идут через COPY. Возвращает количество обработанных строк
+    """
+
+    if not rows:
+        return 0
+
+    # ON CONFLICT не может обновить одну строку дважды за запрос
+    unique: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        unique[tuple(row[key] for key in index_elements)] = row
+    rows = list(unique.values())
+
+    if bulk or len(rows) >= COPY_THRESHOLD:
+        connection = await session.connection()
+        if connection.dialect.driver == "asyncpg":
+            return await copy_upsert_rows(session, model, rows, index_elements)
+
+    columns = [key for key in rows[0] if key not in index_elements]
+
+    for batch in chunked(rows, batch_size):
+        stmt = insert(model).values(list(batch))
+        update_set = {column: stmt.excluded[column] for column in columns}
+        if "synced_at" in model.__table__.c:
+            update_set["synced_at"] = func.now()
+        if "updated_at" in model.__table__.c:
+            update_set["updated_at"] = func.now()
+
+        if update_set:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_=update_set
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        await session.execute(stmt)
+
+    return len(rows)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+async def copy_upsert_rows(
+    session: AsyncSession,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: List[str]
+) -> int:
+    """
+    Загрузка через COPY во временную таблицу и слияние с основной
+    одним INSERT ... SELECT ... ON CONFLICT (только asyncpg).
+    Ключи в rows должны быть уникальны
+    """
+
+    table = model.__table__
+    columns: List[str] = list(rows[0])
+    # Временная таблица видна только своему соединению, поэтому имя
+    # постоянное: текст запросов не меняется и кэш asyncpg не засоряется
+    stage_name: str = f"_stage_{table.name}"
+    stage: str = _quote(stage_name)
+
+    column_list: str = ", ".join(_quote(column) for column in columns)
+    key_list: str = ", ".join(_quote(key) for key in index_elements)
+    update_set: List[str] = [
+        f"{_quote(column)} = EXCLUDED.{_quote(column)}"
+        for column in columns
+        if column not in index_elements
+    ]
+    for column in ("synced_at", "updated_at"):
+        if column in table.c:
+            update_set.append(f"{_quote(column)} = now()")
+    conflict: str = (
+        f"DO UPDATE SET {', '.join(update_set)}" if update_set else "DO NOTHING"
+    )
+
+    await session.execute(text(
+        f"CREATE TEMP TABLE {stage} "
+        f"(LIKE {_quote(table.name)} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+
+    # COPY идет по тому же соединению, что и транзакция сессии
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        stage_name,
+        records=[tuple(row[column] for column in columns) for row in rows],
+        columns=columns
+    )
+
+    await session.execute(text(
+        f"INSERT INTO {_quote(table.name)} ({column_list}) "
+        f"SELECT {column_list} FROM {stage} "
+        f"ON CONFLICT ({key_list}) {conflict}"
+    ))
+    await session.execute(text(f"DROP TABLE {stage}"))
+    return len(rows)
+
+
+async def count_rows(session: AsyncSession, model: Any) -> int:
+    result = await session.execute(select(func.count()).select_from(model))
+    return result.scalar_one()
+
+
+async def db_now(session: AsyncSession) -> datetime:
+    result = await session.execute(select(func.now()))
+    return result.scalar_one()
+
+
+async def delete_not_synced_since(
+    session: AsyncSession,
+    model: Any,
+    since: datetime
+) -> int:
+    """
+    Удалить строки, которые не обновлялись синхронизацией с момента since
+    (их больше нет в CRM). Возвращает количество удаленных строк
+    """
+
+    result = await session.execute(delete(model).where(model.synced_at < since))
+    return result.rowcount
@@ -0,0 +1,110 @@
+import datetime as dt
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import upsert_rows
+from models.finance import Transaction, finance_monthly
+
+
+async def upsert_transactions(
+    session: AsyncSession,
+    rows: List[Dict[str, Any]],
+    bulk: bool = False
+) -> int:
+    return await upsert_rows(
+        session,
+        Transaction,
+        rows,
+        index_elements=["id"],
+        bulk=bulk
+    )
+
+
+def _monthly_totals(since: dt.date, customer_id: Optional[int] = None):
+    """
+    Итоги по месяцам с нарастающим итогом (оконные функции поверх
+    агрегатов). Нарастающий итог считается по всей истории и только
+    потом обрезается до запрошенного периода
+    """
+
+    money = ~finance_monthly.c.is_cyberon
+    cyberon = finance_monthly.c.is_cyberon
+    income = finance_monthly.c.type == "income"
+
+    def total(condition):
+        return func.coalesce(
+            func.sum(finance_monthly.c.amount).filter(condition),
+            0
+        )
+
+    income_total = total(and_(money, income))
+    expense_total = total(and_(money, ~income))
+    earned_total = total(and_(cyberon, income))
+    spent_total = total(and_(cyberon, ~income))
+    running = {"order_by": finance_monthly.c.month}
+
+    query = (
+        select(
+            finance_monthly.c.month,
+            income_total.label("income"),
+            expense_total.label("expense"),
+            earned_total.label("cyberons_earned"),
+            spent_total.label("cyberons_spent"),
+            func.sum(income_total - expense_total).over(**running).label("running_balance"),
+            func.sum(earned_total - spent_total).over(**running).label("running_cyberons"),
+            func.sum(finance_monthly.c.operations).label("operations")
+        )
+        .group_by(finance_monthly.c.month)
+    )
+    if customer_id is not None:
+        query = query.where(finance_monthly.c.customer_id == customer_id)
+
+    totals = query.subquery()
+    return select(totals).where(totals.c.month >= since).order_by(totals.c.month)
+
+
+async def get_monthly_summary(
+    session: AsyncSession,
+    since: dt.date,
+    customer_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Месячные итоги клиента (или всего филиала, если customer_id не задан)
+    """
+
+    result = await session.execute(_monthly_totals(since, customer_id))
+    return [dict(row._mapping) for row in result]
+
+
+async def get_category_summary(
+    session: AsyncSession,
+    since: dt.date,
+    customer_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Суммы по типам операций AlfaCRM за период
+    """
+
+    query = (
+        select(
+            finance_monthly.c.crm_type,
+            finance_monthly.c.type,
+            finance_monthly.c.is_cyberon,
+            func.sum(finance_monthly.c.amount).label("amount"),
+            func.sum(finance_monthly.c.operations).label("operations")
+        )
+        .where(finance_monthly.c.month >= since)
+        .group_by(
+            finance_monthly.c.crm_type,
+            finance_monthly.c.type,
+            finance_monthly.c.is_cyberon
+        )
+        .order_by(func.sum(finance_monthly.c.amount).desc())
+    )
+    if customer_id is not None:
+        query = query.where(finance_monthly.c.customer_id == customer_id)
+
+    result = await session.execute(query)
+    return [dict(row._mapping) for row in result]
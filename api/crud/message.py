@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.message import DirectorMessage
+
+
+async def enqueue_director_message(
+    session: AsyncSession,
+    idempotency_key: str,
+    telegram_id: int,
+    user_name: str,
+    text: str
+) -> int:
+    """
+    Добавить сообщение в outbox. Для повторного ключа возвращается
+    id уже сохраненного сообщения
+    """
+
+    result = await session.execute(
+        insert(DirectorMessage)
+        .values(
+            idempotency_key=idempotency_key,
+            telegram_id=telegram_id,
+            user_name=user_name,
+            text=text
+        )
+        .on_conflict_do_nothing(index_elements=["idempotency_key"])
+        .returning(DirectorMessage.id)
+    )
+    message_id: Optional[int] = result.scalar_one_or_none()
+    if message_id is not None:
+        return message_id
+
+    result = await session.execute(
+        select(DirectorMessage.id)
+        .where(DirectorMessage.idempotency_key == idempotency_key)
+    )
+    return result.scalar_one()
+
+
+async def claim_due_messages(
+    session: AsyncSession,
+    limit: int,
+    lease: float
+) -> List[DirectorMessage]:
+    """
+    Забрать пачку сообщений, готовых к отправке: их next_attempt_at
+    сдвигается на `lease` секунд, поэтому после commit другие воркеры
+    их не видят. Если воркер упадет, не отметив результат, сообщения
+    снова станут доступны по истечении срока
+    """
+
+    due = (
+        select(DirectorMessage.id)
+        .where(
+            DirectorMessage.status == "pending",
+            DirectorMessage.next_attempt_at <= func.now()
+        )
+        .order_by(DirectorMessage.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(
+        update(DirectorMessage)
+        .where(DirectorMessage.id.in_(due.scalar_subquery()))
+        .values(next_attempt_at=func.now() + timedelta(seconds=lease))
+        .returning(DirectorMessage)
+        .execution_options(synchronize_session=False)
+    )
+    return sorted(result.scalars(), key=lambda message: message.id)
+
+
+async def mark_messages_sent(session: AsyncSession, ids: List[int]) -> None:
+    if not ids:
+        return
+
+    await session.execute(
+        update(DirectorMessage)
+        .where(DirectorMessage.id.in_(ids))
+        .values(status="sent", sent_at=datetime.now(timezone.utc), last_error=None)
+    )
+
+
+async def update_messages(
+    session: AsyncSession,
+    ids: List[int],
+    values: Dict[str, Any]
+) -> None:
+    if not ids:
+        return
+
+    await session.execute(
+        update(DirectorMessage)
+        .where(DirectorMessage.id.in_(ids))
+        .values(**values)
+    )
@@ -0,0 +1,30 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import upsert_rows
+from models.sync import SyncWatermark
+
+
+async def get_watermark(
+    session: AsyncSession,
+    entity: str
+) -> Optional[SyncWatermark]:
+    result = await session.execute(
+        select(SyncWatermark).where(SyncWatermark.entity == entity)
+    )
+    return result.scalar_one_or_none()
+
+
+async def save_watermark(
+    session: AsyncSession,
+    entity: str,
+    values: Dict[str, Any]
+) -> None:
+    await upsert_rows(
+        session,
+        SyncWatermark,
+        [{"entity": entity, **values}],
+        index_elements=["entity"]
+    )
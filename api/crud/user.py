@@ -0,0 +1,80 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import upsert_rows
+from models.user import Customer, TelegramLink
+
+
+async def get_customer_id_by_telegram_id(
+    session: AsyncSession,
+    telegram_id: int
+) -> Optional[int]:
+    """
+    Найти id клиента в индексе по telegram_id
+    """
+
+    result = await session.execute(
+        select(TelegramLink.customer_id)
+        .where(TelegramLink.telegram_id == telegram_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def upsert_telegram_links(
+    session: AsyncSession,
+    links: Dict[int, int]
+) -> None:
+    """
+    Добавить или обновить связи telegram_id -> customer_id
+    """
+
+    await upsert_rows(
+        session,
+        TelegramLink,
+        [
+            {"telegram_id": telegram_id, "customer_id": customer_id}
+            for telegram_id, customer_id in links.items()
+        ],
+        index_elements=["telegram_id"]
+    )
+
+
+async def upsert_customers(
+    session: AsyncSession,
+    rows: List[Dict[str, Any]],
+    bulk: bool = False
+) -> int:
+    return await upsert_rows(session, Customer, rows, index_elements=["id"], bulk=bulk)
+
+
+async def delete_telegram_link(
+    session: AsyncSession,
+    telegram_id: int
+) -> None:
+    await session.execute(
+        delete(TelegramLink).where(TelegramLink.telegram_id == telegram_id)
+    )
+
+
+async def count_telegram_links(session: AsyncSession) -> int:
+    result = await session.execute(select(func.count()).select_from(TelegramLink))
+    return result.scalar_one()
+
+
+async def get_telegram_ids_after(
+    session: AsyncSession,
+    after: Optional[int],
+    limit: int
+) -> List[int]:
+    """
+    Страница telegram_id из индекса по возрастанию (keyset-пагинация)
+    """
+
+    query = select(TelegramLink.telegram_id).order_by(TelegramLink.telegram_id)
+    if after is not None:
+        query = query.where(TelegramLink.telegram_id > after)
+
+    result = await session.execute(query.limit(limit))
+    return list(result.scalars())
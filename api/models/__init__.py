@@ -0,0 +1,16 @@
+from models.admin import Rule
+from models.alert import BalanceAlert
+from models.finance import Transaction
+from models.message import DirectorMessage
+from models.sync import SyncWatermark
+from models.user import Customer, TelegramLink
+
+__all__ = [
+    "BalanceAlert",
+    "Customer",
+    "DirectorMessage",
+    "Rule",
+    "SyncWatermark",
+    "TelegramLink",
+    "Transaction"
+]
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    BigInteger, DateTime, Index, Integer, String, UniqueConstraint, func, text
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class BalanceAlert(Base):
+    """
+    Уведомление родителю о низком балансе.
+
+    Строка существует, пока клиент остается ниже порога: повторная проверка
+    не создает дубликат, а после пополнения строка удаляется, чтобы следующее
+    пересечение порога снова дало уведомление
+    """
+
+    __tablename__ = "balance_alerts"
+    __table_args__ = (
+        UniqueConstraint("customer_id", "telegram_id", "kind"),
+        # Бот забирает только неотправленные уведомления по порядку id
+        Index("ix_balance_alerts_pending", "id", postgresql_where=text("sent_at IS NULL")),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    customer_id: Mapped[int] = mapped_column(Integer, index=True)
+    telegram_id: Mapped[int] = mapped_column(BigInteger)
+    # low_lessons | negative_balance
+    kind: Mapped[str] = mapped_column(String(32))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+    sent_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
@@ -0,0 +1,52 @@
+import datetime as dt
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Date, DateTime, Index, Integer, MetaData,
+    Numeric, String, Table, Text, func, text
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class Transaction(Base):
+    """
+    Локальная копия транзакции AlfaCRM (заполняется синхронизацией)
+    """
+
+    __tablename__ = "transactions"
+    __table_args__ = (
+        # История клиента читается "сначала новые"
+        Index("ix_transactions_customer_date", "customer_id", text("date DESC")),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    customer_id: Mapped[int] = mapped_column(Integer)
+    type: Mapped[str] = mapped_column(String(16))
+    crm_type: Mapped[str] = mapped_column(String(64), default="")
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+    currency: Mapped[str] = mapped_column(String(16), default="руб.")
+    description: Mapped[str] = mapped_column(Text, default="")
+    date: Mapped[Optional[dt.date]] = mapped_column(Date, nullable=True)
+    synced_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+
+# Материализованное представление с месячными итогами (services/analytics.py).
+# Отдельные метаданные: create_all не должен создавать его как таблицу
+finance_monthly = Table(
+    "finance_monthly",
+    MetaData(),
+    Column("customer_id", Integer),
+    Column("month", Date),
+    Column("crm_type", String(64)),
+    Column("type", String(16)),
+    Column("is_cyberon", Boolean),
+    Column("amount", Numeric(12, 2)),
+    Column("operations", BigInteger)
+)
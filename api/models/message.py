@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class DirectorMessage(Base):
+    """
+    Исходящее сообщение директору (outbox).
+
+    Обращение считается принятым, как только строка зафиксирована в БД,
+    доставку в чат директоров выполняет фоновый воркер
+    """
+
+    __tablename__ = "director_messages"
+    __table_args__ = (
+        # Воркеру нужны только ожидающие отправки строки
+        Index(
+            "ix_director_messages_due",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Повторная отправка того же сообщения ботом не создает дубликат
+    idempotency_key: Mapped[str] = mapped_column(String(128), unique=True)
+    telegram_id: Mapped[int] = mapped_column(BigInteger)
+    user_name: Mapped[str] = mapped_column(String(255), default="")
+    text: Mapped[str] = mapped_column(Text)
+    # pending | sent | failed
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+    sent_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class SyncWatermark(Base):
+    """
+    Отметка последней синхронизации сущности AlfaCRM
+    """
+
+    __tablename__ = "sync_watermarks"
+
+    entity: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # Последний увиденный id (для сущностей, которые только добавляются)
+    last_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Последнее время изменения (для сущностей, которые редактируются)
+    last_modified: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True
+    )
+    last_full_sync_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+    last_sync_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
@@ -0,0 +1,44 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Integer, Numeric, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class TelegramLink(Base):
+    """
+    Индекс telegram_id -> id клиента в AlfaCRM
+    """
+
+    __tablename__ = "telegram_links"
+
+    telegram_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    customer_id: Mapped[int] = mapped_column(Integer, index=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+
+class Customer(Base):
+    """
+    Локальная копия клиента AlfaCRM (заполняется синхронизацией)
+    """
+
+    __tablename__ = "customers"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(255), default="")
+    telegram_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    balance: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+    paid_lessons: Mapped[int] = mapped_column(Integer, default=0)
+    bonus_points: Mapped[int] = mapped_column(Integer, default=0)
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Request, Response
+
+from app.db import db_stats
+from schemas.admin import RuleKind, RuleResponse, RuleUpdate
+from services.alfacrm import alfacrm_client
+from services.rules import RuleVersion, rules_service
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _set_cache_headers(response: Response, rule: RuleVersion) -> None:
+    response.headers["ETag"] = rule.etag
+    # Клиент может хранить ответ, но обязан проверять его актуальность
+    response.headers["Cache-Control"] = "no-cache"
+    if rule.last_modified is not None:
+        response.headers["Last-Modified"] = rule.last_modified
+
+
+@router.get("/rules/{kind}", response_model=RuleResponse)
+async def get_rules(kind: RuleKind, request: Request, response: Response):
+    rule: RuleVersion = await rules_service.get(kind)
+
+    if request.headers.get("If-None-Match") == rule.etag:
+        not_modified = Response(status_code=304)
+        _set_cache_headers(not_modified, rule)
+        return not_modified
+
+    _set_cache_headers(response, rule)
+    return RuleResponse(text=rule.text, updated_at=rule.updated_at)
+
+
+@router.put("/rules/{kind}", response_model=RuleResponse)
+async def update_rules(
+    kind: RuleKind,
+    data: RuleUpdate,
+    response: Response
+) -> RuleResponse:
+    rule: RuleVersion = await rules_service.update(kind, data.text)
+    _set_cache_headers(response, rule)
+    return RuleResponse(text=rule.text, updated_at=rule.updated_at)
+
+
+@router.get("/metrics")
+async def get_metrics() -> dict:
+    """
+    Состояние интеграции с AlfaCRM (предохранитель, лимитер, кэши)
+    и пулов БД (ожидание соединений, маршрутизация на реплику)
+    """
+
+    return {"alfacrm": alfacrm_client.stats(), "db": db_stats()}
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Query
+
+from app.db import AsyncSessionLocal
+from crud import alert as crud_alert
+from schemas.alert import AlertsAck, BalanceAlertItem, BalanceAlertsResponse
+
+router = APIRouter(prefix="/alerts", tags=["alerts"])
+
+
+@router.get("/pending", response_model=BalanceAlertsResponse)
+async def get_pending_alerts(
+    limit: int = Query(default=100, ge=1, le=1000)
+) -> BalanceAlertsResponse:
+    async with AsyncSessionLocal() as session:
+        rows = await crud_alert.get_pending_alerts(session, limit)
+
+    return BalanceAlertsResponse(
+        alerts=[BalanceAlertItem(**row) for row in rows]
+    )
+
+
+@router.post("/ack")
+async def ack_alerts(data: AlertsAck) -> dict:
+    async with AsyncSessionLocal() as session:
+        updated: int = await crud_alert.mark_alerts_sent(session, data.ids)
+        await session.commit()
+
+    return {"acknowledged": updated}
@@ -0,0 +1,177 @@
+import base64
+import logging
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.db import ReadSessionLocal
+from crud import finance as crud_finance
+from routers.users import get_snapshot_or_error
+from schemas.finance import (
+    BalanceResponse,
+    FinanceHistoryResponse,
+    FinanceSummaryResponse
+)
+from services import jsonlib
+from services.alfacrm import alfacrm_client
+from services.analytics import finance_rollups
+from services.records import TransactionRecord
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/finance", tags=["finance"])
+
+DEFAULT_FOCUS_GROUP = "Основная группа"
+
+
+@router.get("/balance", response_model=BalanceResponse)
+async def get_balance(telegram_id: int = Query(...)) -> BalanceResponse:
+    snapshot = await get_snapshot_or_error(telegram_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    return BalanceResponse(
+        focus_group=snapshot.focus_group or DEFAULT_FOCUS_GROUP,
+        money_balance=snapshot.balance,
+        paid_lessons=snapshot.paid_lessons,
+        cyberon_balance=snapshot.bonus_points,
+        stale=snapshot.stale
+    )
+
+
+def encode_cursor(page: int, limit: int) -> str:
+    raw: str = f"p:{page}:{limit}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], limit: int) -> int:
+    """
+    Номер страницы CRM из курсора (пустой курсор - первая страница).
+    Номер страницы имеет смысл только при том размере страницы,
+    с которым курсор выдан, поэтому размер хранится в курсоре
+    """
+
+    if not cursor:
+        return 0
+    try:
+        raw: str = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, page, page_size = raw.split(":")
+        if prefix != "p" or not page.isdigit() or not page_size.isdigit():
+            raise ValueError(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if int(page_size) != limit:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cursor was issued for limit={page_size}"
+        )
+    return int(page)
+
+
+async def _stream_history(
+    header: Dict[str, Any],
+    transactions: List[TransactionRecord]
+) -> AsyncIterator[bytes]:
+    # Заголовок страницы, затем строки по одной: ответ не собирается
+    # целиком в памяти, сколько бы строк ни было на странице
+    yield jsonlib.dumps(header)[:-1] + b',"transactions":['
+    for index, tx in enumerate(transactions):
+        # to_item() уже в формате TransactionItem, проверка pydantic не нужна
+        item: bytes = jsonlib.dumps(tx.to_item())
+        yield item if index == 0 else b"," + item
+    yield b"]}"
+
+
+@router.get("/history", response_model=FinanceHistoryResponse)
+async def get_history(
+    telegram_id: int = Query(...),
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=10, ge=1, le=50)
+) -> StreamingResponse:
+    page: int = decode_cursor(cursor, limit)
+
+    snapshot = await get_snapshot_or_error(telegram_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    try:
+        result, stale = await alfacrm_client.get_customer_transactions(
+            snapshot.customer_id,
+            page=page,
+            page_size=limit
+        )
+    except Exception as e:
+        logger.error(f"Error loading transactions for telegram_id {telegram_id}: {e}")
+        raise HTTPException(status_code=503, detail="AlfaCRM is unavailable")
+
+    header: Dict[str, Any] = {
+        "focus_group": snapshot.focus_group or DEFAULT_FOCUS_GROUP,
+        "stale": stale or snapshot.stale,
+        "page": page + 1,
+        "next_cursor": encode_cursor(page + 1, limit) if result["has_next"] else None,
+        "prev_cursor": encode_cursor(page - 1, limit) if page > 0 else None
+    }
+    return StreamingResponse(
+        _stream_history(header, result["transactions"]),
+        media_type="application/json"
+    )
+
+
+def _months_ago(months: int) -> date:
+    today: date = date.today()
+    index: int = today.year * 12 + today.month - 1 - (months - 1)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def _build_summary(
+    months: int,
+    customer_id: Optional[int] = None
+) -> FinanceSummaryResponse:
+    since: date = _months_ago(months)
+    async with ReadSessionLocal() as session:
+        monthly = await crud_finance.get_monthly_summary(session, since, customer_id)
+        categories = await crud_finance.get_category_summary(session, since, customer_id)
+
+    return FinanceSummaryResponse(
+        customer_id=customer_id,
+        since=since,
+        months=monthly,
+        categories=categories,
+        refreshed_at=finance_rollups.refreshed_at
+    )
+
+
+@router.get("/summary", response_model=FinanceSummaryResponse)
+async def get_summary(
+    telegram_id: int = Query(...),
+    months: int = Query(default=12, ge=1, le=120)
+) -> FinanceSummaryResponse:
+    """
+    Итоги клиента по месяцам по синхронизированным транзакциям
+    """
+
+    try:
+        customer_id: Optional[int] = await alfacrm_client.resolve_customer_id(
+            telegram_id
+        )
+    except Exception as e:
+        logger.error(f"Error resolving customer for telegram_id {telegram_id}: {e}")
+        raise HTTPException(status_code=503, detail="AlfaCRM is unavailable")
+    if customer_id is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    return await _build_summary(months, customer_id)
+
+
+@router.get("/summary/branch", response_model=FinanceSummaryResponse)
+async def get_branch_summary(
+    months: int = Query(default=12, ge=1, le=120)
+) -> FinanceSummaryResponse:
+    """
+    Итоги всего филиала по месяцам
+    """
+
+    return await _build_summary(months)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from schemas.message import DirectorMessageAccepted, DirectorMessageCreate
+from services.outbox import director_outbox
+
+router = APIRouter(prefix="/messages", tags=["messages"])
+
+
+@router.post("/director", response_model=DirectorMessageAccepted, status_code=202)
+async def send_to_director(data: DirectorMessageCreate) -> DirectorMessageAccepted:
+    # Сообщение принято, как только записано в outbox; доставка - в фоне
+    message_id: int = await director_outbox.enqueue(
+        idempotency_key=data.idempotency_key,
+        telegram_id=data.telegram_id,
+        user_name=data.user_name,
+        text=data.message
+    )
+    return DirectorMessageAccepted(id=message_id)
@@ -0,0 +1,65 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.db import ReadSessionLocal
+from crud import user as crud_user
+from schemas.user import CustomerSnapshot, TelegramIdsPage, UserProfile
+from services.alfacrm import alfacrm_client
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+async def get_snapshot_or_error(telegram_id: int) -> Optional[CustomerSnapshot]:
+    """
+    Снимок клиента по telegram_id; ошибка CRM превращается в 503
+    """
+
+    try:
+        return await alfacrm_client.get_customer_snapshot_by_telegram_id(
+            telegram_id
+        )
+    except Exception as e:
+        logger.error(f"Error loading snapshot for telegram_id {telegram_id}: {e}")
+        raise HTTPException(status_code=503, detail="AlfaCRM is unavailable")
+
+
+@router.get("/snapshot", response_model=CustomerSnapshot)
+async def get_snapshot(telegram_id: int = Query(...)) -> CustomerSnapshot:
+    snapshot = await get_snapshot_or_error(telegram_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return snapshot
+
+
+@router.get("/profile", response_model=UserProfile)
+async def get_profile(telegram_id: int = Query(...)) -> UserProfile:
+    snapshot = await get_snapshot_or_error(telegram_id)
+    # Пустой профиль - пользователь не зарегистрирован
+    if snapshot is None:
+        return UserProfile()
+    return UserProfile(
+        full_name=snapshot.full_name,
+        group_name=snapshot.focus_group
+    )
+
+
+@router.get("/telegram-ids", response_model=TelegramIdsPage)
+async def get_telegram_ids(
+    after: Optional[int] = Query(default=None),
+    limit: int = Query(default=500, ge=1, le=5000)
+) -> TelegramIdsPage:
+    """
+    Получатели рассылок: все привязанные telegram_id постранично
+    """
+
+    async with ReadSessionLocal() as session:
+        telegram_ids = await crud_user.get_telegram_ids_after(session, after, limit)
+
+    return TelegramIdsPage(
+        telegram_ids=telegram_ids,
+        next_after=telegram_ids[-1] if len(telegram_ids) == limit else None
+    )
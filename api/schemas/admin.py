@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+RuleKind = Literal["bot", "school"]
+
+
+class RuleResponse(BaseModel):
+    text: str = ""
+    updated_at: Optional[datetime] = None
+
+
+class RuleUpdate(BaseModel):
+    text: str = Field(..., max_length=4000)
@@ -0,0 +1,22 @@
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+AlertKind = Literal["low_lessons", "negative_balance"]
+
+
+class BalanceAlertItem(BaseModel):
+    id: int
+    telegram_id: int
+    kind: AlertKind
+    name: str
+    balance: float
+    paid_lessons: int
+
+
+class BalanceAlertsResponse(BaseModel):
+    alerts: List[BalanceAlertItem]
+
+
+class AlertsAck(BaseModel):
+    ids: List[int] = Field(..., max_length=1000)
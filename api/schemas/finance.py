@@ -0,0 +1,58 @@
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class BalanceResponse(BaseModel):
+    focus_group: str
+    money_balance: float
+    paid_lessons: int
+    cyberon_balance: int
+    stale: bool = False
+
+
+class TransactionItem(BaseModel):
+    type: Literal["income", "expense"]
+    amount: float
+    currency: str
+    description: str
+    date: str
+
+
+class FinanceHistoryResponse(BaseModel):
+    focus_group: str
+    stale: bool = False
+    # Номер страницы (с 1) и курсоры соседних страниц
+    page: int = 1
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    transactions: List[TransactionItem]
+
+
+class MonthlySummary(BaseModel):
+    month: date
+    income: float
+    expense: float
+    cyberons_earned: float
+    cyberons_spent: float
+    # Нарастающие итоги с начала истории
+    running_balance: float
+    running_cyberons: float
+    operations: int
+
+
+class CategorySummary(BaseModel):
+    crm_type: str
+    type: Literal["income", "expense"]
+    is_cyberon: bool
+    amount: float
+    operations: int
+
+
+class FinanceSummaryResponse(BaseModel):
+    customer_id: Optional[int] = None
+    since: date
+    months: List[MonthlySummary]
+    categories: List[CategorySummary]
+    refreshed_at: Optional[datetime] = None
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+
+class DirectorMessageCreate(BaseModel):
+    telegram_id: int
+    message: str = Field(..., min_length=1, max_length=3500)
+    user_name: str = Field(default="unknown", max_length=255)
+    # Например "<chat_id>:<message_id>" - повтор запроса не дублирует сообщение
+    idempotency_key: str = Field(..., min_length=1, max_length=128)
+
+
+class DirectorMessageAccepted(BaseModel):
+    success: bool = True
+    id: int
@@ -0,0 +1,33 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, computed_field
+
+
+class CustomerSnapshot(BaseModel):
+    """
+    Профиль, баланс и группы клиента, полученные одним запросом к AlfaCRM
+    """
+
+    customer_id: int
+    full_name: str
+    groups: List[str] = Field(default_factory=list)
+    balance: float = 0
+    paid_lessons: int = 0
+    bonus_points: int = 0
+    # Данные из кэша, пока AlfaCRM недоступна
+    stale: bool = False
+
+    @computed_field
+    @property
+    def focus_group(self) -> Optional[str]:
+        return self.groups[0] if self.groups else None
+
+
+class UserProfile(BaseModel):
+    full_name: Optional[str] = None
+    group_name: Optional[str] = None
+
+
+class TelegramIdsPage(BaseModel):
+    telegram_ids: List[int]
+    next_after: Optional[int] = None
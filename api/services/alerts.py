@@ -0,0 +1,26 @@
+import logging
+
+from app.config import settings
+from app.db import AsyncSessionLocal
+from crud import alert as crud_alert
+
+logger = logging.getLogger(__name__)
+
+
+async def detect_balance_alerts() -> int:
+    """
+    Найти клиентов, опустившихся ниже порогов, по синхронизированным данным.
+    Запускается после каждой синхронизации, CRM при этом не запрашивается
+    """
+
+    async with AsyncSessionLocal() as session:
+        created: int = await crud_alert.detect_balance_alerts(
+            session,
+            lessons_threshold=settings.alert_lessons_threshold,
+            balance_threshold=settings.alert_balance_threshold
+        )
+        await session.commit()
+
+    if created:
+        logger.info(f"Queued {created} low balance alerts")
+    return created
@@ -1,11 +1,57 @@
+import asyncio
 import httpx
+import json
 import logging
-from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from importlib.util import find_spec
+from typing import (
+    Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set,
+    Tuple, TypeVar
+)
 
 from app.config import settings
+from app.db import AsyncSessionLocal, ReadSessionLocal
+from crud import user as crud_user
+from schemas.user import CustomerSnapshot
+from services import jsonlib
+from services.cache import CacheEntry, TTLCache
+from services.ratelimit import PriorityRateLimiter
+from services.records import CustomerRecord, TransactionRecord
+from services.resilience import CircuitBreaker, call_with_retries
+from services.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Временные ошибки AlfaCRM: сеть, таймауты, 5xx и 429
+    """
+
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status: int = error.response.status_code
+        return status >= 500 or status == 429
+    return False
+
+
+def is_service_failure(error: BaseException) -> bool:
+    """
+    Ошибки, говорящие о недоступности AlfaCRM. 429 - это ответ
+    работающего сервера: запрос повторяется, но цепь не размыкает
+    """
+
+    if (
+        isinstance(error, httpx.HTTPStatusError) and
+        error.response.status_code == 429
+    ):
+        return False
+    return is_retryable_error(error)
+
 
 class AlfaCRMClient:
     def __init__(self) -> None:
@@ -20,9 +66,97 @@ class AlfaCRMClient:
             "Accept": "application/json",
             "Content-Type": "application/json"
         }
-        self.timeout = 30.0
+        # Соединение должно устанавливаться быстро, а тяжелые выборки
+        # клиентов могут отвечать дольше
+        self.timeout = httpx.Timeout(
+            settings.alfacrm_read_timeout,
+            connect=settings.alfacrm_connect_timeout
+        )
+        self.breaker = CircuitBreaker(
+            name="alfacrm",
+            failure_threshold=settings.alfacrm_breaker_failure_threshold,
+            recovery_timeout=settings.alfacrm_breaker_recovery_timeout
+        )
+        self.stale_served: int = 0
+        # Квота API-ключа общая для бота и синхронизации
+        self.limiter = PriorityRateLimiter(
+            rate=settings.alfacrm_rate_limit,
+            burst=settings.alfacrm_rate_burst
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self.inflight = SingleFlight()
+        self.balance_cache: TTLCache[Dict[str, Any]] = TTLCache(
+            name="balance",
+            max_size=settings.cache_max_size,
+            ttl=settings.cache_ttl_seconds,
+            stale_ttl=settings.cache_stale_ttl_seconds
+        )
+        self.transactions_cache: TTLCache[List[Dict[str, Any]]] = TTLCache(
+            name="transactions",
+            max_size=settings.cache_max_size,
+            ttl=settings.cache_ttl_seconds,
+            stale_ttl=settings.cache_stale_ttl_seconds
+        )
+        self.snapshot_cache: TTLCache[Optional[CustomerSnapshot]] = TTLCache(
+            name="snapshot",
+            max_size=settings.cache_max_size,
+            ttl=settings.cache_ttl_seconds,
+            stale_ttl=settings.cache_stale_ttl_seconds
+        )
         logger.info(f"AlfaCRM client initialized for branch {self.branch_id}")
 
+    async def start(self) -> None:
+        """
+        Создать общий пул соединений с AlfaCRM.
+        Вызывается один раз при старте приложения (lifespan)
+        """
+
+        if self._client is not None:
+            return
+
+        http2: bool = settings.alfacrm_http2
+        if http2 and find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but h2 is not installed")
+            http2 = False
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=self.timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.alfacrm_max_connections,
+                max_keepalive_connections=(
+                    settings.alfacrm_max_keepalive_connections
+                ),
+                keepalive_expiry=settings.alfacrm_keepalive_expiry
+            )
+        )
+        logger.info(
+            f"AlfaCRM connection pool started "
+            f"(max_connections={settings.alfacrm_max_connections}, "
+            f"http2={http2})"
+        )
+
+    async def close(self) -> None:
+        """
+        Закрыть пул соединений
+        """
+
+        await self.limiter.close()
+        if self._client is None:
+            return
+
+        await self._client.aclose()
+        self._client = None
+        logger.info("AlfaCRM connection pool closed")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Клиент создается лениво, если start() не был вызван (скрипты, тесты)
+        if self._client is None:
+            await self.start()
+        return self._client
+
     async def _make_request(
         self,
         method: str,
@@ -30,29 +164,97 @@ class AlfaCRMClient:
         **kwargs
     ) -> Dict[str, Any]:
         """
-        Универсальный метод для запросов к AlfaCRM
+        Универсальный метод для запросов к AlfaCRM.
+        Все запросы идут через предохранитель; идемпотентные GET
+        повторяются при временных ошибках, а одновременные одинаковые
+        GET объединяются в один
         """
 
-        # Create URL
-        url: str = self.base_url + endpoint
-        
-        if 'headers' not in kwargs:
-            kwargs['headers'] = self.headers
+        if method.upper() != "GET":
+            return await call_with_retries(
+                lambda: self._send(method, endpoint, **kwargs),
+                breaker=self.breaker,
+                is_retryable=is_retryable_error,
+                is_failure=is_service_failure,
+                attempts=1
+            )
 
-        if 'timeout' not in kwargs:
-            kwargs['timeout'] = self.timeout
+        key = (endpoint, self._normalize_params(kwargs))
+        return await self.inflight.do(
+            key,
+            lambda: call_with_retries(
+                lambda: self._send(method, endpoint, **kwargs),
+                breaker=self.breaker,
+                is_retryable=is_retryable_error,
+                is_failure=is_service_failure,
+                attempts=settings.alfacrm_retry_attempts,
+                base_delay=settings.alfacrm_retry_base_delay
+            )
+        )
+
+    async def _get_with_fallback(
+        self,
+        cache: TTLCache[T],
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]]
+    ) -> Tuple[T, bool]:
+        """
+        Значение из кэша или CRM. Если CRM недоступна, отдается последнее
+        известное значение любой давности с признаком stale=True;
+        без него ошибка пробрасывается
+        """
 
         try:
-            async with httpx.AsyncClient() as client:
-                logger.debug(f"Making {method} request to {url}")
-                response = await client.request(method, url, **kwargs)
+            return await cache.get_or_load(key, loader), False
+        except PermissionError:
+            raise
+        except Exception as e:
+            entry: Optional[CacheEntry[T]] = cache.peek(key)
+            if entry is None:
+                raise
+            self.stale_served += 1
+            logger.warning(
+                f"Serving stale {cache.name} for {key} "
+                f"({entry.age:.0f}s old): {e}"
+            )
+            return entry.value, True
 
-                if response.status_code == 401:
-                    logger.error("AlfaCRM authentication failed")
-                    raise PermissionError("Invalid AlfaCRM API token")
+    @staticmethod
+    def _normalize_params(kwargs: Dict[str, Any]) -> str:
+        return json.dumps(kwargs, sort_keys=True, default=str)
 
-                response.raise_for_status()
-                return response.json()
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> Dict[str, Any]:
+        # Create URL (заголовки и таймаут уже заданы в общем клиенте)
+        url: str = self.base_url + endpoint.lstrip("/")
+        client: httpx.AsyncClient = await self._get_client()
+
+        # Полоса приоритета берется из контекста вызывающей задачи
+        await self.limiter.acquire()
+
+        try:
+            logger.debug(f"Making {method} request to {url}")
+            response = await client.request(method, url, **kwargs)
+
+            if response.status_code == 401:
+                logger.error("AlfaCRM authentication failed")
+                raise PermissionError("Invalid AlfaCRM API token")
+
+            if response.status_code == 429:
+                self.limiter.throttle(
+                    self._parse_retry_after(response.headers.get("Retry-After"))
+                )
+            elif response.is_success:
+                # Ошибки 5xx не повод повышать темп запросов
+                self.limiter.on_success()
+
+            response.raise_for_status()
+            # Разбор байтов без промежуточной строки
+            return jsonlib.loads(response.content)
         except httpx.TimeoutException:
             logger.error(f"Timeout for AlfaCRM request: {url}")
             raise
@@ -66,58 +268,298 @@ class AlfaCRMClient:
             logger.error(f"Unexpected error in AlfaCRM request: {e}")
             raise
 
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            # Retry-After в виде HTTP-даты
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
     # --- Customer methods ---
 
+    async def _lookup_telegram_index(self, telegram_id: int) -> Optional[int]:
+        try:
+            # Индекс читается с реплики: если ссылки там еще нет,
+            # клиент будет найден поиском в CRM
+            async with ReadSessionLocal() as session:
+                return await crud_user.get_customer_id_by_telegram_id(
+                    session,
+                    telegram_id
+                )
+        except Exception as e:
+            logger.error(f"Telegram index lookup failed for {telegram_id}: {e}")
+            return None
+
+    async def _save_telegram_links(self, links: Dict[int, int]) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await crud_user.upsert_telegram_links(session, links)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to save telegram index entries: {e}")
+
+    async def _drop_telegram_link(self, telegram_id: int) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await crud_user.delete_telegram_link(session, telegram_id)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to drop telegram index entry {telegram_id}: {e}")
+
+    async def get_customers_by_ids(
+        self,
+        customer_ids: Iterable[int],
+        with_: Optional[List[str]] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Получить клиентов по списку id.
+        Список режется на пачки по alfacrm_batch_size, пачки запрашиваются
+        параллельно (не больше alfacrm_batch_concurrency одновременно)
+        """
+
+        ids: List[int] = sorted(set(customer_ids))
+        if not ids:
+            return {}
+
+        size: int = settings.alfacrm_batch_size
+        semaphore = asyncio.Semaphore(settings.alfacrm_batch_concurrency)
+
+        async def fetch_chunk(chunk: List[int]) -> List[Dict[str, Any]]:
+            params: Dict[str, Any] = {
+                "id": chunk[0] if len(chunk) == 1 else chunk
+            }
+            if len(chunk) > 1:
+                params["count"] = len(chunk)
+            if with_:
+                params["with"] = with_
+
+            async with semaphore:
+                response: Dict[str, Any] = await self._make_request(
+                    method="GET",
+                    endpoint="/customer/index",
+                    params=params
+                )
+            return response.get("items", [])
+
+        chunks: List[List[Dict[str, Any]]] = await asyncio.gather(*(
+            fetch_chunk(ids[start:start + size])
+            for start in range(0, len(ids), size)
+        ))
+        return {
+            int(customer["id"]): customer
+            for items in chunks
+            for customer in items
+            if customer.get("id") is not None
+        }
+
+    async def get_customer_by_id(
+        self,
+        customer_id: int,
+        with_: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Получить клиента по id в AlfaCRM
+        """
+
+        customers = await self.get_customers_by_ids([customer_id], with_=with_)
+        return customers.get(customer_id)
+
     async def get_customer_by_telegram_id(
         self,
         telegram_id: int
     ) -> Optional[Dict[str, Any]]:
         """
-        Найти клиента по telegram_id в custom полях
+        Найти клиента по telegram_id.
+        Сначала ищем в локальном индексе, в AlfaCRM идем только при промахе
         """
 
         try:
-            # Ищем клиента в AlfaCRM по кастомному полю telegram_id
-            params: Dict[str, Any] = {
-                "page": 0,
-                "with": [
-                    "customers",
-                    "customers.custom_fields",
-                    "customers.balance"
-                ]
-            }
-            
-            response: Dict[str, Any] = await self._make_request(
-                method="GET",
-                endpoint="/customer/index",
-                params=params
+            customer_id: Optional[int] = await self._lookup_telegram_index(
+                telegram_id
             )
-
-            customers: List[Dict] = response.get("items", [])
-            for customer in customers:
-                custom_fields: Dict = customer.get("custom_fields", {})
-                # Ищем поле с telegram_id (может быть field_1, field_2 и т.д.)
-                for field_key, field_value in custom_fields.items():
-                    if (
-                        isinstance(field_value, str) and
-                        field_value.strip() == str(telegram_id)
-                    ):
-                        return customer
-                    if (
-                        isinstance(field_value, int) and
-                        field_value == telegram_id
-                    ):
-                        return customer
-
-            # Если не нашли по telegram_id, можно попробовать по другим полям
-            # Например, по ID в CRM
-            return None
+            if customer_id is not None:
+                customer = await self.get_customer_by_id(
+                    customer_id,
+                    with_=["custom_fields", "balance"]
+                )
+                if customer is not None:
+                    return customer
+                # Клиент удален в CRM - запись в индексе устарела
+                await self._drop_telegram_link(telegram_id)
+
+            customer = await self._scan_customers_for_telegram_id(telegram_id)
+            if customer is not None and customer.get("id") is not None:
+                await self._save_telegram_links(
+                    {telegram_id: int(customer["id"])}
+                )
+            return customer
         except Exception as e:
             logger.error(
                 f"Error finding customer by telegram_id {telegram_id}: {e}"
             )
             return None
 
+    async def resolve_customer_id(self, telegram_id: int) -> Optional[int]:
+        """
+        Найти id клиента по telegram_id: индекс, при промахе - поиск в CRM
+        """
+
+        customer_id: Optional[int] = await self._lookup_telegram_index(telegram_id)
+        if customer_id is not None:
+            return customer_id
+
+        customer = await self._scan_customers_for_telegram_id(telegram_id)
+        if customer is None or customer.get("id") is None:
+            return None
+
+        customer_id = int(customer["id"])
+        await self._save_telegram_links({telegram_id: customer_id})
+        return customer_id
+
+    # --- Customer snapshot ---
+
+    @staticmethod
+    def _build_snapshot(customer: Dict[str, Any]) -> CustomerSnapshot:
+        record = CustomerRecord.from_crm(customer)
+        return CustomerSnapshot(
+            customer_id=record.id,
+            full_name=record.name,
+            groups=list(record.groups),
+            balance=record.balance,
+            paid_lessons=record.paid_lessons,
+            bonus_points=record.bonus_points
+        )
+
+    async def _load_customer_snapshot(
+        self,
+        customer_id: int
+    ) -> Optional[CustomerSnapshot]:
+        customer = await self.get_customer_by_id(
+            customer_id,
+            with_=["custom_fields", "balance", "groups"]
+        )
+        if customer is None:
+            return None
+        return self._build_snapshot(customer)
+
+    async def get_customer_snapshot(
+        self,
+        customer_id: int
+    ) -> Optional[CustomerSnapshot]:
+        """
+        Профиль, баланс и группы клиента одним запросом (через кэш)
+        """
+
+        snapshot, stale = await self._get_with_fallback(
+            self.snapshot_cache,
+            customer_id,
+            lambda: self._load_customer_snapshot(customer_id)
+        )
+        if stale and snapshot is not None:
+            snapshot = snapshot.model_copy(update={"stale": True})
+        return snapshot
+
+    async def get_customer_snapshot_by_telegram_id(
+        self,
+        telegram_id: int
+    ) -> Optional[CustomerSnapshot]:
+        customer_id: Optional[int] = await self.resolve_customer_id(telegram_id)
+        if customer_id is None:
+            return None
+
+        snapshot = await self.get_customer_snapshot(customer_id)
+        if snapshot is None:
+            # Клиент удален в CRM - запись в индексе устарела
+            await self._drop_telegram_link(telegram_id)
+        return snapshot
+
+    @staticmethod
+    def _has_telegram_id(customer: Dict[str, Any], telegram_id: int) -> bool:
+        custom_fields: Dict = customer.get("custom_fields") or {}
+        # Ищем поле с telegram_id (может быть field_1, field_2 и т.д.)
+        for field_value in custom_fields.values():
+            if (
+                isinstance(field_value, str) and
+                field_value.strip() == str(telegram_id)
+            ):
+                return True
+            if (
+                isinstance(field_value, int) and
+                field_value == telegram_id
+            ):
+                return True
+        return False
+
+    async def _scan_customers_for_telegram_id(
+        self,
+        telegram_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Найти клиента по telegram_id в custom полях (медленный путь):
+        страницы /customer/index просматриваются до первого совпадения
+        """
+
+        # Ищем клиента в AlfaCRM по кастомному полю telegram_id
+        params: Dict[str, Any] = {
+            "with": [
+                "customers",
+                "customers.custom_fields",
+                "customers.balance"
+            ]
+        }
+        page_size: int = settings.crm_sync_max_page_size
+
+        page: int = 0
+        while True:
+            response: Dict[str, Any] = await self.fetch_page(
+                "/customer/index",
+                page=page,
+                page_size=page_size,
+                params=params
+            )
+
+            customers: List[Dict] = response.get("items", [])
+            for customer in customers:
+                if self._has_telegram_id(customer, telegram_id):
+                    return customer
+
+            total: Optional[int] = response.get("total")
+            if total is not None:
+                has_next: bool = (page + 1) * page_size < int(total)
+            else:
+                has_next = len(customers) == page_size
+            if not customers or not has_next:
+                return None
+            page += 1
+
+    async def fetch_page(
+        self,
+        endpoint: str,
+        page: int,
+        page_size: int,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Получить одну страницу списка (для постраничной синхронизации)
+        """
+
+        page_params: Dict[str, Any] = dict(params or {})
+        page_params["page"] = page
+        page_params["count"] = page_size
+
+        return await self._make_request(
+            method="GET",
+            endpoint=endpoint,
+            params=page_params
+        )
+
     async def get_customer_by_phone(
         self,
         phone: str
@@ -151,84 +593,144 @@ class AlfaCRMClient:
             logger.error(f"Error finding customer by phone {phone}: {e}")
             return None
 
-    async def get_customer_balance(self, customer_id: int) -> Dict[str, Any]:
+    async def get_customer_balance(
+        self,
+        customer_id: int
+    ) -> Optional[Dict[str, Any]]:
         """
-        Получить баланс клиента
+        Получить баланс клиента (через кэш), None - клиента нет в CRM.
+        Если CRM недоступна, отдается последний известный баланс
+        с "stale": True, а без него - ошибка: нулевой баланс вместо
+        ошибки вводил бы родителей в заблуждение
         """
 
-        try:
-            params: Dict[str, Any] = {
-                "id": customer_id,
-                "with": ["balance"]
-            }
-
-            response: Dict[str, Any] = await self._make_request(
-                method="GET",
-                endpoint="/customer/index",
-                params=params
-            )
-            customers: List[Dict] = response.get("items", [])
+        balance, stale = await self._get_with_fallback(
+            self.balance_cache,
+            customer_id,
+            lambda: self._load_customer_balance(customer_id)
+        )
+        if balance is None:
+            return None
+        return {**balance, "stale": stale}
 
-            if not customers:
-                return {"balance": 0, "paid_lessons": 0}
+    async def get_customers_balances(
+        self,
+        customer_ids: Iterable[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Получить балансы нескольких клиентов (свежие значения берутся
+        из кэша, остальные запрашиваются пачками). Клиентов, которых
+        нет в CRM, в результате нет
+        """
 
-            customer: Dict[str, Any] = customers[0]
-            balance_data: Dict[str, Any] = customer.get("balance", {})
+        balances: Dict[int, Dict[str, Any]] = {}
+        missing: List[int] = []
+        for customer_id in set(customer_ids):
+            cached = self.balance_cache.get(customer_id)
+            if cached is not None:
+                balances[customer_id] = cached
+            else:
+                missing.append(customer_id)
+
+        loaded = await self._load_customers_balances(missing)
+        for customer_id, balance in loaded.items():
+            self.balance_cache.set(customer_id, balance)
+        balances.update(loaded)
+        return balances
+
+    async def _load_customer_balance(
+        self,
+        customer_id: int
+    ) -> Optional[Dict[str, Any]]:
+        balances = await self._load_customers_balances([customer_id])
+        return balances.get(customer_id)
 
-            # Преобразуем данные AlfaCRM в наш формат
-            return {
-                "balance": float(balance_data.get("balance", 0)),
-                "paid_lessons": int(balance_data.get("lesson_balance", 0)),
-                "bonus_points": int(balance_data.get("bonus_balance", 0))
-            }
-        except Exception as e:
-            logger.error(
-                f"Error getting balance for customer {customer_id}: {e}"
-            )
-            return {"balance": 0, "paid_lessons": 0, "bonus_points": 0}
+    async def _load_customers_balances(
+        self,
+        customer_ids: List[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        customers = await self.get_customers_by_ids(
+            customer_ids,
+            with_=["balance"]
+        )
+        return {
+            customer_id: CustomerRecord.from_crm(customer).balance_dict()
+            for customer_id, customer in customers.items()
+        }
 
     async def get_customer_transactions(
-        self, 
-        customer_id: int, 
-        limit: int = 50
-    ) -> List[Dict[str, Any]] | List:
+        self,
+        customer_id: int,
+        page: int = 0,
+        page_size: int = 10
+    ) -> Tuple[Dict[str, Any], bool]:
         """
-        Получить историю транзакций клиента
+        Одна страница истории транзакций клиента (через кэш), новые первыми.
+        Возвращает ({"transactions": [TransactionRecord], "has_next": bool},
+        stale) - см. _get_with_fallback
         """
 
-        try:
-            params: Dict[str, Any] = {
-                "page": 0,
-                "customer_id": customer_id,
-                "with": ["transactions"],
-                "limit": limit,
-                "order": "date_desc"
-            }
+        return await self._get_with_fallback(
+            self.transactions_cache,
+            (customer_id, page, page_size),
+            lambda: self._load_customer_transactions(customer_id, page, page_size)
+        )
 
-            response: Dict[str, Any] = await self._make_request(
-                method="GET",
-                endpoint="/transaction/index",
-                params=params
-            )
-            transactions: List[Dict] = response.get("items", [])
-
-            # Преобразуем в наш формат
-            formatted_transactions: List[Dict[str, Any]] = []
-            for tx in transactions[:limit]:
-                formatted_transactions.append({
-                    "type": "income" if tx.get("type") in ["payment", "correction_in"] else "expense",
-                    "amount": abs(float(tx.get("value", 0))),
-                    "currency": tx.get("currency", "руб."),
-                    "description": tx.get("comment", ""),
-                    "date": tx.get("date", "")
-                })
-
-            return formatted_transactions
-        except Exception as e:
-            logger.error(
-                f"Error getting transactions for customer {customer_id}: {e}"
-            )
-            return []
+    async def _load_customer_transactions(
+        self,
+        customer_id: int,
+        page: int,
+        page_size: int
+    ) -> Dict[str, Any]:
+        response: Dict[str, Any] = await self.fetch_page(
+            "/transaction/index",
+            page=page,
+            page_size=page_size,
+            params={"customer_id": customer_id, "order": "date_desc"}
+        )
+        items: List[Dict[str, Any]] = response.get("items", [])[:page_size]
+
+        total: Optional[int] = response.get("total")
+        if total is not None:
+            has_next: bool = (page + 1) * page_size < int(total)
+        else:
+            has_next = len(items) == page_size
+
+        return {
+            "transactions": [TransactionRecord.from_crm(tx) for tx in items],
+            "has_next": has_next
+        }
+
+    def invalidate_customer(self, customer_id: int) -> None:
+        """
+        Сбросить кэш клиента (например, после новой оплаты)
+        """
+
+        self.invalidate_customers({customer_id})
+
+    def invalidate_customers(self, customer_ids: Set[int]) -> None:
+        for customer_id in customer_ids:
+            self.balance_cache.invalidate(customer_id)
+            self.snapshot_cache.invalidate(customer_id)
+        self.transactions_cache.invalidate_where(
+            lambda key: key[0] in customer_ids
+        )
+
+    def cache_stats(self) -> List[Dict[str, Any]]:
+        return [
+            self.balance_cache.stats(),
+            self.transactions_cache.stats(),
+            self.snapshot_cache.stats()
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "rate_limiter": self.limiter.stats(),
+            "stale_served": self.stale_served,
+            "inflight": self.inflight.stats(),
+            "caches": self.cache_stats()
+        }
 
     async def get_customer_groups(self, customer_id: int) -> List[str]:
         """
@@ -236,26 +738,30 @@ class AlfaCRMClient:
         """
 
         try:
-            params = {
-                "id": customer_id,
-                "with": ["groups"]
-            }
-            
-            response = await self._make_request("GET", "/customer/index", params=params)
-            customers = response.get("items", [])
-            
-            if not customers:
-                return []
-            
-            customer = customers[0]
-            groups = customer.get("groups", [])
-            
-            return [group.get("name", "") for group in groups if group.get("name")]
-            
+            groups = await self.get_customers_groups([customer_id])
+            return groups.get(customer_id, [])
         except Exception as e:
             logger.error(f"Error getting groups for customer {customer_id}: {e}")
             return []
 
+    async def get_customers_groups(
+        self,
+        customer_ids: Iterable[int]
+    ) -> Dict[int, List[str]]:
+        """
+        Получить группы нескольких клиентов
+        """
+
+        customers = await self.get_customers_by_ids(customer_ids, with_=["groups"])
+        return {
+            customer_id: [
+                group.get("name", "")
+                for group in customer.get("groups", [])
+                if group.get("name")
+            ]
+            for customer_id, customer in customers.items()
+        }
+
     async def search_customers(self, query: str) -> List[Dict[str, Any]]:
         """Поиск клиентов по различным параметрам"""
         try:
@@ -280,34 +786,77 @@ class AlfaCRMClient:
     ) -> bool:
         """Обновить telegram_id в кастомном поле клиента"""
         try:
-            # Получаем текущие данные клиента
-            params = {"id": customer_id}
-            response = await self._make_request("GET", "/customer/index", params=params)
-            customers = response.get("items", [])
-            
-            if not customers:
+            results = await self.update_customers_telegram_ids(
+                {customer_id: telegram_id}
+            )
+            return results.get(customer_id, False)
+        except Exception as e:
+            logger.error(f"Error updating telegram_id for customer {customer_id}: {e}")
+            return False
+
+    async def update_customers_telegram_ids(
+        self,
+        telegram_ids: Dict[int, int]
+    ) -> Dict[int, bool]:
+        """
+        Обновить telegram_id у нескольких клиентов.
+        telegram_ids: customer_id -> telegram_id.
+        Возвращает customer_id -> успех обновления
+        """
+
+        # Получаем текущие данные клиентов
+        customers = await self.get_customers_by_ids(telegram_ids.keys())
+        semaphore = asyncio.Semaphore(settings.alfacrm_batch_concurrency)
+
+        async def update(customer_id: int, telegram_id: int) -> bool:
+            customer: Optional[Dict[str, Any]] = customers.get(customer_id)
+            if customer is None:
                 return False
-            
-            customer = customers[0]
-            custom_fields = customer.get("custom_fields", {})
-            
+
+            # Копия: ответ может быть общим для нескольких вызовов
+            custom_fields = dict(customer.get("custom_fields") or {})
+
             # Обновляем поле с telegram_id
             # Нужно определить ID кастомного поля в вашем AlfaCRM
             # Например, если поле называется "telegram_id" и имеет ID 1:
-            custom_fields["1"] = str(telegram_id)
-            
+            custom_fields[settings.alfacrm_telegram_field] = str(telegram_id)
+
             # Отправляем обновление
             update_data = {
                 "id": customer_id,
                 "custom_fields": custom_fields
             }
-            
-            await self._make_request("POST", "/customer/update", json=update_data)
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error updating telegram_id for customer {customer_id}: {e}")
-            return False
+
+            try:
+                async with semaphore:
+                    await self._make_request(
+                        "POST",
+                        "/customer/update",
+                        json=update_data
+                    )
+                return True
+            except Exception as e:
+                logger.error(
+                    f"Error updating telegram_id for customer {customer_id}: {e}"
+                )
+                return False
+
+        items = list(telegram_ids.items())
+        updated: List[bool] = await asyncio.gather(*(
+            update(customer_id, telegram_id)
+            for customer_id, telegram_id in items
+        ))
+        results: Dict[int, bool] = {
+            customer_id: ok
+            for (customer_id, _), ok in zip(items, updated)
+        }
+
+        await self._save_telegram_links({
+            telegram_id: customer_id
+            for customer_id, telegram_id in items
+            if results[customer_id]
+        })
+        return results
 
 
 alfacrm_client = AlfaCRMClient()
@@ -0,0 +1,102 @@
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.db import engine
+
+logger = logging.getLogger(__name__)
+
+# Месячные итоги по клиенту и типу операции. Кибероны отличаются
+# от денежных операций по типу транзакции AlfaCRM
+FINANCE_MONTHLY_DDL = """
+CREATE MATERIALIZED VIEW finance_monthly AS
+SELECT
+    customer_id,
+    date_trunc('month', date)::date AS month,
+    crm_type,
+    type,
+    crm_type LIKE '{cyberon_prefix}%' ESCAPE '\\' AS is_cyberon,
+    sum(amount) AS amount,
+    count(*) AS operations
+FROM transactions
+WHERE date IS NOT NULL
+GROUP BY customer_id, month, crm_type, type
+"""
+
+# Уникальный индекс нужен для REFRESH ... CONCURRENTLY
+FINANCE_MONTHLY_INDEXES = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_finance_monthly_key "
+    "ON finance_monthly (customer_id, month, crm_type, type)",
+    "CREATE INDEX IF NOT EXISTS ix_finance_monthly_month "
+    "ON finance_monthly (month)"
+)
+
+# Версия определения хранится в комментарии к представлению
+FINANCE_MONTHLY_VERSION_QUERY = (
+    "SELECT obj_description(to_regclass('finance_monthly'), 'pg_class')"
+)
+
+
+class FinanceRollups:
+    """
+    Предрассчитанные месячные итоги по транзакциям.
+
+    Материализованное представление пересчитывается после каждой
+    синхронизации, поэтому сводки читают несколько строк на клиента
+    вместо всей истории операций
+    """
+
+    def __init__(self) -> None:
+        self.refreshed_at: Optional[datetime] = None
+
+    async def ensure(self) -> None:
+        """
+        Создать представление; если его определение изменилось
+        (например, CYBERON_CRM_TYPE_PREFIX), пересоздать
+        """
+
+        # Префикс сравнивается буквально, как str.startswith в records
+        prefix: str = (
+            settings.cyberon_crm_type_prefix
+            .replace("\\", "\\\\")
+            .replace("%", "\\%")
+            .replace("_", "\\_")
+            .replace("'", "''")
+        )
+        ddl: str = FINANCE_MONTHLY_DDL.format(cyberon_prefix=prefix)
+        version: str = hashlib.sha1(ddl.encode()).hexdigest()[:16]
+
+        async with engine.begin() as conn:
+            current: Optional[str] = (
+                await conn.execute(text(FINANCE_MONTHLY_VERSION_QUERY))
+            ).scalar()
+            if current == version:
+                logger.info("Finance rollups ready")
+                return
+
+            if current is not None:
+                logger.info(f"Finance rollups definition changed ({current} -> {version})")
+            await conn.execute(text("DROP MATERIALIZED VIEW IF EXISTS finance_monthly"))
+            await conn.execute(text(ddl))
+            for index_ddl in FINANCE_MONTHLY_INDEXES:
+                await conn.execute(text(index_ddl))
+            await conn.execute(
+                text(f"COMMENT ON MATERIALIZED VIEW finance_monthly IS '{version}'")
+            )
+        logger.info("Finance rollups created")
+
+    async def refresh(self) -> None:
+        started: float = time.monotonic()
+        async with engine.begin() as conn:
+            # CONCURRENTLY не блокирует чтение сводок на время пересчета
+            await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY finance_monthly"))
+        self.refreshed_at = datetime.now(timezone.utc)
+        logger.info(f"Finance rollups refreshed in {time.monotonic() - started:.2f}s")
+
+
+finance_rollups = FinanceRollups()
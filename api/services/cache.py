@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class CacheEntry(Generic[T]):
+    value: T
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class TTLCache(Generic[T]):
+    """
+    LRU-кэш с TTL и stale-while-revalidate.
+
+    Пока запись моложе `ttl`, она отдается как есть. Если запись старше
+    `ttl`, но моложе `ttl + stale_ttl`, она отдается сразу, а в фоне
+    запускается обновление. Более старые записи считаются промахом.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int,
+        ttl: float,
+        stale_ttl: float = 0.0
+    ) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry[T]]" = OrderedDict()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        # Поколение ключа увеличивается при его инвалидации, чтобы загрузка,
+        # начатая до нее, не записала в кэш устаревшее значение. Хранится
+        # только для ключей, которые сейчас загружаются
+        self._loading: Dict[Hashable, int] = {}
+        self._generations: Dict[Hashable, int] = {}
+        # То же для clear(): сбрасывает все загрузки сразу
+        self._epoch: int = 0
+
+        self.hits: int = 0
+        self.stale_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.refresh_errors: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refresh_errors": self.refresh_errors
+        }
+
+    def set(self, key: Hashable, value: T) -> None:
+        self._entries[key] = CacheEntry(value=value, stored_at=time.monotonic())
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._loading:
+            self._generations[key] = self._generations.get(key, 0) + 1
+        self._entries.pop(key, None)
+        task = self._refreshing.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        keys = {key for key in self._entries if predicate(key)}
+        keys.update(key for key in self._loading if predicate(key))
+        for key in keys:
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """
+        Получить свежее значение без загрузки (None при промахе)
+        """
+
+        entry: Optional[CacheEntry[T]] = self._entries.get(key)
+        if entry is not None and entry.age < self.ttl:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry.value
+
+        self.misses += 1
+        return None
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry[T]]:
+        """
+        Запись любой давности без учета TTL и статистики
+        (последнее известное значение, когда источник недоступен)
+        """
+
+        return self._entries.get(key)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Получить значение из кэша или загрузить его через loader.
+        Ошибки loader пробрасываются и не кэшируются
+        """
+
+        entry: Optional[CacheEntry[T]] = self._entries.get(key)
+
+        if entry is not None:
+            age: float = entry.age
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._schedule_refresh(key, loader)
+                return entry.value
+
+        self.misses += 1
+        return await self._load(key, loader)
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]]
+    ) -> T:
+        epoch: int = self._epoch
+        generation: int = self._generations.get(key, 0)
+        self._loading[key] = self._loading.get(key, 0) + 1
+        try:
+            value: T = await loader()
+            if epoch == self._epoch and generation == self._generations.get(key, 0):
+                self.set(key, value)
+            return value
+        finally:
+            self._loading[key] -= 1
+            if not self._loading[key]:
+                del self._loading[key]
+                self._generations.pop(key, None)
+
+    def _schedule_refresh(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]]
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._load(key, loader)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.warning(f"Background refresh failed for {self.name} {key}: {e}")
+            finally:
+                if self._refreshing.get(key) is asyncio.current_task():
+                    del self._refreshing[key]
+
+        self._refreshing[key] = asyncio.create_task(refresh())
@@ -0,0 +1,27 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Разобрать JSON прямо из байтов ответа (orjson, если установлен)
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Сериализовать в JSON (UTF-8 без экранирования кириллицы)
+    """
+
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
@@ -0,0 +1,234 @@
+import asyncio
+import html
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.db import AsyncSessionLocal
+from crud import message as crud_message
+from models.message import DirectorMessage
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+
+
+class TelegramRetryAfter(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Flood control, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class DirectorOutbox:
+    """
+    Доставка сообщений директору из таблицы director_messages.
+
+    Эндпоинт только сохраняет сообщение и будит воркер, поэтому пользователь
+    получает ответ сразу, а медленный Telegram не держит обработчики.
+    Воркер забирает пачку строк короткой транзакцией (FOR UPDATE SKIP LOCKED
+    и аренда на `lease` секунд), отправляет их в чат директоров вне
+    транзакции и повторяет неудачные с экспоненциальной задержкой.
+    Доставка "как минимум один раз": при падении между отправкой и записью
+    результата сообщение придет повторно после окончания аренды
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 20,
+        max_attempts: int = 10,
+        poll_interval: float = 5.0,
+        max_backoff: float = 3600.0,
+        lease: float = 600.0
+    ) -> None:
+        self.url: str = TELEGRAM_API_URL.format(
+            token=settings.telegram_bot_token.get_secret_value()
+        )
+        self.chat_id: str = settings.directors_chat_id
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+        self.sent: int = 0
+        self.retried: int = 0
+        self.failed: int = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sent": self.sent, "retried": self.retried, "failed": self.failed}
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(max_connections=5, max_keepalive_connections=5)
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        logger.info(f"Director outbox stopped: {self.stats()}")
+
+    def notify(self) -> None:
+        """
+        Разбудить воркер после записи нового сообщения
+        """
+
+        self._wakeup.set()
+
+    async def enqueue(
+        self,
+        idempotency_key: str,
+        telegram_id: int,
+        user_name: str,
+        text: str
+    ) -> int:
+        async with AsyncSessionLocal() as session:
+            message_id: int = await crud_message.enqueue_director_message(
+                session,
+                idempotency_key=idempotency_key,
+                telegram_id=telegram_id,
+                user_name=user_name,
+                text=text
+            )
+            await session.commit()
+
+        self.notify()
+        return message_id
+
+    @staticmethod
+    def format_message(message: DirectorMessage) -> str:
+        created_at: str = (
+            message.created_at.strftime("%d.%m.%Y %H:%M")
+            if message.created_at else ""
+        )
+        return (
+            f"📩 <b>Сообщение директору</b>\n"
+            f"От: {html.escape(message.user_name or 'unknown')} "
+            f"(id <code>{message.telegram_id}</code>)\n"
+            f"{created_at}\n\n"
+            f"{html.escape(message.text)}"
+        )
+
+    async def _deliver(self, message: DirectorMessage) -> None:
+        response: httpx.Response = await self._client.post(
+            self.url,
+            json={
+                "chat_id": self.chat_id,
+                "text": self.format_message(message),
+                "parse_mode": "HTML"
+            }
+        )
+
+        if response.status_code == 429:
+            retry_after = response.json().get("parameters", {}).get("retry_after", 5)
+            raise TelegramRetryAfter(float(retry_after))
+        response.raise_for_status()
+
+    def _backoff(self, attempts: int) -> float:
+        delay: float = min(self.max_backoff, 2 ** attempts)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _retry_values(
+        self,
+        message: DirectorMessage,
+        error: str,
+        delay: float
+    ) -> Dict[str, Any]:
+        attempts: int = message.attempts + 1
+        values: Dict[str, Any] = {"attempts": attempts, "last_error": error[:1000]}
+        if attempts >= self.max_attempts:
+            values["status"] = "failed"
+            self.failed += 1
+            logger.error(f"Director message {message.id} failed permanently: {error}")
+        else:
+            values["next_attempt_at"] = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            self.retried += 1
+        return values
+
+    async def process_batch(self) -> int:
+        """
+        Отправить одну пачку сообщений. Возвращает количество обработанных строк
+        """
+
+        async with AsyncSessionLocal() as session:
+            messages: List[DirectorMessage] = await crud_message.claim_due_messages(
+                session,
+                self.batch_size,
+                self.lease
+            )
+            await session.commit()
+
+        if not messages:
+            return 0
+
+        delivered: List[int] = []
+        updates: List[Tuple[List[int], Dict[str, Any]]] = []
+
+        for index, message in enumerate(messages):
+            try:
+                await self._deliver(message)
+                delivered.append(message.id)
+            except TelegramRetryAfter as e:
+                # Лимит общий для бота: остаток пачки откладывается
+                # на то же время без увеличения счетчика попыток
+                logger.warning(f"Director outbox throttled: {e}")
+                resume_at = datetime.now(timezone.utc) + timedelta(seconds=e.retry_after)
+                updates.append((
+                    [postponed.id for postponed in messages[index:]],
+                    {"next_attempt_at": resume_at}
+                ))
+                break
+            except Exception as e:
+                logger.warning(f"Failed to deliver director message {message.id}: {e}")
+                updates.append((
+                    [message.id],
+                    self._retry_values(message, str(e), self._backoff(message.attempts))
+                ))
+
+        async with AsyncSessionLocal() as session:
+            await crud_message.mark_messages_sent(session, delivered)
+            for ids, values in updates:
+                await crud_message.update_messages(session, ids, values)
+            await session.commit()
+
+        self.sent += len(delivered)
+        return len(messages)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                while await self.process_batch() >= self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Director outbox iteration failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+director_outbox = DirectorOutbox(
+    batch_size=settings.outbox_batch_size,
+    max_attempts=settings.outbox_max_attempts,
+    poll_interval=settings.outbox_poll_interval
+)
@@ -0,0 +1,202 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Полосы приоритета: меньше - важнее
+INTERACTIVE = 0
+BACKGROUND = 1
+
+LANE_NAMES: Dict[int, str] = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Приоритет текущей задачи; фоновые задания переключают его через background()
+request_priority: ContextVar[int] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def background() -> Iterator[None]:
+    """
+    Запросы внутри блока идут в полосе фоновых заданий
+    """
+
+    token = request_priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class LaneStats:
+    def __init__(self) -> None:
+        self.waiting: int = 0
+        self.granted: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+
+    def observe(self, wait: float) -> None:
+        self.granted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.waiting,
+            "granted": self.granted,
+            "avg_wait_ms": round(
+                self.total_wait / self.granted * 1000 if self.granted else 0.0,
+                1
+            ),
+            "max_wait_ms": round(self.max_wait * 1000, 1)
+        }
+
+
+class PriorityRateLimiter:
+    """
+    Token bucket с полосами приоритета.
+
+    Токены выдаются по `rate` в секунду с запасом до `burst`. Если токенов
+    нет, запросы ждут в очереди, и освободившийся токен всегда получает
+    самый приоритетный ожидающий: интерактивные запросы бота обгоняют
+    фоновую синхронизацию.
+
+    Скорость подстраивается под сервер (AIMD): ответ 429 уменьшает ее вдвое
+    и приостанавливает выдачу на Retry-After, каждый успешный ответ
+    понемногу возвращает ее к `max_rate`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        min_rate: Optional[float] = None,
+        recovery_step: float = 0.05
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.burst = burst
+        self.recovery_step = recovery_step
+        self._tokens: float = burst
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+        self.throttled: int = 0
+        self.lanes: Dict[int, LaneStats] = {
+            lane: LaneStats() for lane in LANE_NAMES
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": round(self.rate, 2),
+            "max_rate": self.max_rate,
+            "throttled": self.throttled,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 1),
+            "lanes": {
+                LANE_NAMES[lane]: stats.snapshot()
+                for lane, stats in self.lanes.items()
+            }
+        }
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self) -> bool:
+        now: float = time.monotonic()
+        if now < self._paused_until:
+            return False
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, priority: Optional[int] = None) -> None:
+        lane: int = request_priority.get() if priority is None else priority
+        stats: LaneStats = self.lanes[lane]
+
+        # Быстрый путь: очереди нет и токен есть
+        if not self._waiters and self._try_take():
+            stats.observe(0.0)
+            return
+
+        started: float = time.monotonic()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._counter), started, future))
+        stats.waiting += 1
+        self._ensure_dispatcher()
+
+        try:
+            await future
+        finally:
+            stats.waiting -= 1
+        stats.observe(time.monotonic() - started)
+
+    def _ensure_dispatcher(self) -> None:
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            self._wakeup.clear()
+            if self._try_take():
+                # Отмененные ожидания токен не забирают
+                while self._waiters:
+                    _, _, _, future = heapq.heappop(self._waiters)
+                    if not future.done():
+                        future.set_result(None)
+                        break
+                else:
+                    self._tokens += 1
+                continue
+
+            now: float = time.monotonic()
+            delay: float = max(
+                self._paused_until - now,
+                (1 - self._tokens) / self.rate
+            )
+            try:
+                # Ждем появления токена. Каждый новый ожидающий будит
+                # диспетчер раньше (_ensure_dispatcher), а пауза, продленная
+                # throttle(), учитывается на следующей итерации
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0.001))
+            except asyncio.TimeoutError:
+                pass
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Сервер ответил 429: снизить скорость и выдержать паузу
+        """
+
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        pause: float = retry_after if retry_after is not None else 1 / self.rate
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        self._tokens = 0
+        logger.warning(
+            f"AlfaCRM rate limited: pausing {pause:.1f}s, rate {self.rate:.2f} req/s"
+        )
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for _, _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
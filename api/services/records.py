@@ -0,0 +1,172 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+
+# Типы транзакций AlfaCRM, которые считаются поступлением денег
+INCOME_TYPES = frozenset({"payment", "correction_in"})
+
+
+def is_cyberon_type(crm_type: str) -> bool:
+    return crm_type.startswith(settings.cyberon_crm_type_prefix)
+
+
+def transaction_direction(crm_type: str, value: Decimal) -> str:
+    """
+    Направление операции: "income" или "expense".
+
+    Денежные операции различаются по типу AlfaCRM. У киберонов тип
+    общий для начисления и списания, поэтому направление берется
+    из знака суммы (суффиксы _in/_out, если они есть, важнее знака)
+    """
+
+    if not is_cyberon_type(crm_type):
+        return "income" if crm_type in INCOME_TYPES else "expense"
+    if crm_type.endswith("_in"):
+        return "income"
+    if crm_type.endswith("_out"):
+        return "expense"
+    return "income" if value > 0 else "expense"
+
+
+def parse_crm_date(value: Any) -> Optional[date]:
+    """
+    Разобрать дату из AlfaCRM (ISO или dd.mm.yyyy)
+    """
+
+    if not value or not isinstance(value, str):
+        return None
+
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, "%d.%m.%Y").date()
+    except ValueError:
+        return None
+
+
+def parse_telegram_id(custom_fields: Optional[Dict[str, Any]]) -> Optional[int]:
+    """
+    Достать telegram_id из кастомного поля клиента
+    """
+
+    value = (custom_fields or {}).get(settings.alfacrm_telegram_field)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+@dataclass(slots=True, frozen=True)
+class CustomerRecord:
+    """
+    Клиент AlfaCRM: только поля, которые использует приложение.
+    Ответ CRM разбирается сразу, исходный JSON дальше не хранится
+    """
+
+    id: int
+    name: str
+    telegram_id: Optional[int]
+    balance: float
+    paid_lessons: int
+    bonus_points: int
+    groups: Tuple[str, ...]
+    updated_at: Optional[str]
+
+    @classmethod
+    def from_crm(cls, item: Dict[str, Any]) -> "CustomerRecord":
+        balance: Dict[str, Any] = item.get("balance") or {}
+        return cls(
+            id=int(item["id"]),
+            name=item.get("name") or "",
+            telegram_id=parse_telegram_id(item.get("custom_fields")),
+            balance=float(balance.get("balance", 0)),
+            paid_lessons=int(balance.get("lesson_balance", 0)),
+            bonus_points=int(balance.get("bonus_balance", 0)),
+            groups=tuple(
+                group["name"]
+                for group in item.get("groups") or []
+                if group.get("name")
+            ),
+            updated_at=item.get("updated_at")
+        )
+
+    def balance_dict(self) -> Dict[str, Any]:
+        return {
+            "balance": self.balance,
+            "paid_lessons": self.paid_lessons,
+            "bonus_points": self.bonus_points
+        }
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "telegram_id": self.telegram_id,
+            "balance": self.balance,
+            "paid_lessons": self.paid_lessons,
+            "bonus_points": self.bonus_points
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class TransactionRecord:
+    """
+    Транзакция AlfaCRM в нашем формате
+    """
+
+    id: Optional[int]
+    customer_id: int
+    type: str
+    crm_type: str
+    amount: Decimal
+    currency: str
+    description: str
+    date: str
+
+    @classmethod
+    def from_crm(cls, item: Dict[str, Any]) -> "TransactionRecord":
+        crm_type: str = item.get("type") or ""
+        value = Decimal(str(item.get("value") or 0))
+        return cls(
+            id=int(item["id"]) if item.get("id") is not None else None,
+            customer_id=int(item.get("customer_id") or 0),
+            # Сумма хранится по модулю, знак переносится в type
+            type=transaction_direction(crm_type, value),
+            crm_type=crm_type,
+            amount=abs(value),
+            currency=item.get("currency") or "руб.",
+            description=item.get("comment") or "",
+            date=item.get("date") or ""
+        )
+
+    def to_item(self) -> Dict[str, Any]:
+        """
+        Транзакция для ответа API (schemas.finance.TransactionItem)
+        """
+
+        return {
+            "type": self.type,
+            "amount": float(self.amount),
+            "currency": self.currency,
+            "description": self.description,
+            "date": self.date
+        }
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "customer_id": self.customer_id,
+            "type": self.type,
+            "crm_type": self.crm_type,
+            "amount": self.amount,
+            "currency": self.currency,
+            "description": self.description,
+            "date": parse_crm_date(self.date)
+        }
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Внешний сервис недоступен, запрос отклонен без обращения к нему
+    """
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для внешнего сервиса.
+
+    После `failure_threshold` ошибок подряд цепь размыкается и запросы
+    сразу отклоняются с CircuitOpenError. Через `recovery_timeout` секунд
+    пропускается один пробный запрос: успех замыкает цепь, ошибка снова
+    размыкает ее на тот же срок.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state: str = CLOSED
+        self._failures: int = 0
+        self._opened_at: float = 0.0
+        self._probe_in_flight: bool = False
+
+        self.rejected: int = 0
+        self.transitions: Counter = Counter()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions)
+        }
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.transitions[f"{self.state}->{state}"] += 1
+        log = logger.warning if state == OPEN else logger.info
+        log(f"Circuit {self.name}: {self.state} -> {state}")
+        self.state = state
+
+    def before_call(self) -> None:
+        """
+        Проверить, можно ли обращаться к сервису (иначе CircuitOpenError)
+        """
+
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} is unavailable")
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            # Пока идет пробный запрос, остальные отклоняются
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} is recovering")
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """
+        Запрос завершился ошибкой, не относящейся к доступности сервиса
+        """
+
+        self._probe_in_flight = False
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """
+    Экспоненциальная задержка с полным джиттером
+    """
+
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+async def call_with_retries(
+    fn: Callable[[], Awaitable[T]],
+    breaker: CircuitBreaker,
+    is_retryable: Callable[[BaseException], bool],
+    attempts: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 5.0,
+    is_failure: Optional[Callable[[BaseException], bool]] = None
+) -> T:
+    """
+    Вызвать fn через предохранитель, повторяя временные ошибки
+    (is_retryable). В счетчик отказов идут только повторяемые ошибки,
+    для которых is_failure истинно (по умолчанию все); остальные
+    не влияют на состояние цепи. Размыкание цепи прекращает повторы
+    """
+
+    attempt: int = 0
+    while True:
+        breaker.before_call()
+        try:
+            result: T = await fn()
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.release()
+                raise
+            if is_failure is None or is_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            attempt += 1
+            if attempt >= attempts:
+                raise
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+        await asyncio.sleep(backoff_delay(attempt - 1, base_delay, max_delay))
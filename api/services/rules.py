@@ -0,0 +1,75 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Optional
+
+from app.db import AsyncSessionLocal
+from crud import admin as crud_admin
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RuleVersion:
+    text: str
+    updated_at: Optional[datetime]
+
+    @property
+    def etag(self) -> str:
+        digest: str = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        return f'"{digest[:32]}"'
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        if self.updated_at is None:
+            return None
+        return format_datetime(self.updated_at, usegmt=True)
+
+
+class RulesService:
+    """
+    Правила бота и школы.
+
+    `version` меняется при каждом изменении правил и отдается в заголовке
+    X-Rules-Version во всех ответах API, чтобы бот сбрасывал свой кэш
+    правил сразу после правки, не дожидаясь TTL.
+    """
+
+    def __init__(self) -> None:
+        self.version: str = "0"
+
+    def _observe(self, updated_at: Optional[datetime]) -> None:
+        if updated_at is not None and updated_at.isoformat() > self.version:
+            self.version = updated_at.isoformat()
+
+    async def load_version(self) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                for rule in await crud_admin.get_rules(session):
+                    self._observe(rule.updated_at)
+        except Exception as e:
+            logger.error(f"Failed to load rules version: {e}")
+
+    async def get(self, kind: str) -> RuleVersion:
+        async with AsyncSessionLocal() as session:
+            rule = await crud_admin.get_rule(session, kind)
+
+        if rule is None:
+            return RuleVersion(text="", updated_at=None)
+
+        self._observe(rule.updated_at)
+        return RuleVersion(text=rule.text, updated_at=rule.updated_at)
+
+    async def update(self, kind: str, text: str) -> RuleVersion:
+        async with AsyncSessionLocal() as session:
+            rule = await crud_admin.save_rule(session, kind, text)
+            await session.commit()
+
+        self._observe(rule.updated_at)
+        logger.info(f"Rules '{kind}' updated, version {self.version}")
+        return RuleVersion(text=rule.text, updated_at=rule.updated_at)
+
+
+rules_service = RulesService()
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых запросов.
+
+    Пока запрос с ключом выполняется, остальные вызовы с тем же ключом
+    ждут его и получают тот же результат (или ту же ошибку).
+    Результат после завершения не хранится.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls: int = 0
+        self.shared: int = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "shared": self.shared
+        }
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+
+        if task is None:
+            self.calls += 1
+            # Запрос выполняется в отдельной задаче, чтобы отмена
+            # первого вызывающего не отменяла его для остальных
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Помечаем ошибку как полученной, даже если все ожидающие отменены
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,534 @@
+import asyncio
+import logging
+import time
+from functools import partial
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db import AsyncSessionLocal
+from crud import base as crud_base
+from crud import finance as crud_finance
+from crud import sync as crud_sync
+from crud import user as crud_user
+from models.finance import Transaction
+from models.sync import SyncWatermark
+from models.user import Customer
+from services.alerts import detect_balance_alerts
+from services.alfacrm import AlfaCRMClient, alfacrm_client
+from services.analytics import finance_rollups
+from services.ratelimit import background
+from services.records import CustomerRecord, TransactionRecord
+
+logger = logging.getLogger(__name__)
+
+Sink = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+@dataclass
+class SyncStats:
+    entity: str
+    pages: int = 0
+    rows: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return max(end - self.started_at, 1e-9)
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.elapsed
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    endpoint: str
+    params: Dict[str, Any]
+    model: Any
+    # Поле, по которому определяются новые записи: "id" или "updated_at"
+    cursor_field: str
+    # Сортировка "сначала новые" для инкрементальной выгрузки
+    delta_order: str
+
+
+ENTITIES: Dict[str, EntitySpec] = {
+    "customers": EntitySpec(
+        endpoint="/customer/index",
+        params={"with": ["custom_fields", "balance"]},
+        model=Customer,
+        cursor_field="updated_at",
+        delta_order="updated_at_desc"
+    ),
+    "transactions": EntitySpec(
+        endpoint="/transaction/index",
+        params={},
+        model=Transaction,
+        cursor_field="id",
+        delta_order="id_desc"
+    )
+}
+
+
+class WatermarkTracker:
+    """
+    Отслеживает максимальное значение курсора среди увиденных записей
+    """
+
+    def __init__(self, field: str, since: Any = None) -> None:
+        self.field = field
+        self.since = since
+        self.value = since
+
+    def cursor(self, item: Dict[str, Any]) -> Any:
+        raw = item.get(self.field)
+        if raw is None:
+            return None
+        if self.field == "id":
+            return int(raw)
+        try:
+            return datetime.fromisoformat(str(raw))
+        except ValueError:
+            return None
+
+    def is_newer(self, item: Dict[str, Any]) -> bool:
+        cursor = self.cursor(item)
+        # Записи без курсора считаем измененными, чтобы ничего не потерять
+        if cursor is None or self.since is None:
+            return True
+        # Для времени изменения берем >=: в одну секунду могло быть
+        # несколько правок, повторная запись безопасна (upsert)
+        if self.field == "id":
+            return cursor > self.since
+        return cursor >= self.since
+
+    def observe(self, items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            cursor = self.cursor(item)
+            if cursor is not None and (self.value is None or cursor > self.value):
+                self.value = cursor
+
+
+class CRMSyncEngine:
+    """
+    Постраничная выгрузка списков AlfaCRM в локальные таблицы.
+
+    Страницы запрашиваются окнами по `concurrency` штук, запись окна в БД
+    идет параллельно с загрузкой следующего, поэтому в памяти не больше
+    двух окон. Размер страницы подстраивается под время ответа CRM.
+    """
+
+    def __init__(
+        self,
+        client: AlfaCRMClient,
+        concurrency: int = settings.crm_sync_concurrency,
+        page_size: int = settings.crm_sync_page_size,
+        min_page_size: int = settings.crm_sync_min_page_size,
+        max_page_size: int = settings.crm_sync_max_page_size,
+        target_page_latency: float = settings.crm_sync_target_page_latency
+    ) -> None:
+        self.client = client
+        self.concurrency = max(concurrency, 1)
+        self.initial_page_size = page_size
+        self.min_page_size = min_page_size
+        self.max_page_size = max_page_size
+        self.target_page_latency = target_page_latency
+        # Размер страницы запоминается между запусками для каждого эндпойнта
+        self._page_sizes: Dict[str, int] = {}
+        self._page_size_caps: Dict[str, int] = {}
+
+    async def sync_customers(self) -> SyncStats:
+        return await self.sync_full("customers")
+
+    async def sync_transactions(self) -> SyncStats:
+        return await self.sync_full("transactions")
+
+    async def sync_all(self) -> List[SyncStats]:
+        return [await self.sync_full(entity) for entity in ENTITIES]
+
+    async def sync_all_incremental(self) -> List[SyncStats]:
+        return [await self.sync_incremental(entity) for entity in ENTITIES]
+
+    # --- Full / incremental ---
+
+    def _sink_for(self, entity: str, bulk: bool = False) -> Sink:
+        # Окна полной выгрузки пишутся через COPY, небольшие дельты - INSERT
+        if entity == "customers":
+            return partial(self._store_customers, bulk=bulk)
+        return partial(self._store_transactions, bulk=bulk)
+
+    async def sync_full(self, entity: str) -> SyncStats:
+        """
+        Полная выгрузка сущности с обновлением watermark.
+        Строки, которых не было в выгрузке, удалены в CRM и удаляются
+        локально, иначе счетчики строк никогда не сойдутся
+        """
+
+        spec: EntitySpec = ENTITIES[entity]
+        sink: Sink = self._sink_for(entity, bulk=True)
+        tracker = WatermarkTracker(spec.cursor_field)
+
+        # Время берется из БД: synced_at проставляет сервер
+        async with AsyncSessionLocal() as session:
+            started_at: datetime = await crud_base.db_now(session)
+
+        async def tracking_sink(items: List[Dict[str, Any]]) -> None:
+            tracker.observe(items)
+            await sink(items)
+
+        stats: SyncStats = await self._walk(
+            entity=entity,
+            endpoint=spec.endpoint,
+            params=spec.params,
+            sink=tracking_sink
+        )
+        # Пустая выгрузка скорее сбой CRM, чем удаление всех записей
+        if stats.rows:
+            await self._delete_missing(entity, spec, started_at)
+        await self._save_watermark(entity, tracker, full=True)
+        return stats
+
+    async def _delete_missing(
+        self,
+        entity: str,
+        spec: EntitySpec,
+        started_at: datetime
+    ) -> None:
+        async with AsyncSessionLocal() as session:
+            deleted: int = await crud_base.delete_not_synced_since(
+                session,
+                spec.model,
+                started_at
+            )
+            await session.commit()
+        if deleted:
+            logger.info(f"Removed {deleted} {entity} deleted in CRM")
+
+    async def sync_incremental(self, entity: str) -> SyncStats:
+        """
+        Загрузить только записи, изменившиеся после watermark.
+        Если watermark нет, он устарел или локальные данные разошлись
+        с CRM - выполняется полная синхронизация
+        """
+
+        spec: EntitySpec = ENTITIES[entity]
+
+        async with AsyncSessionLocal() as session:
+            watermark: Optional[SyncWatermark] = await crud_sync.get_watermark(
+                session,
+                entity
+            )
+
+        if not self._watermark_usable(watermark):
+            logger.info(f"No usable watermark for {entity}, running full sync")
+            return await self.sync_full(entity)
+
+        since = (
+            watermark.last_id
+            if spec.cursor_field == "id"
+            else watermark.last_modified
+        )
+        stats, crm_total, tracker = await self._walk_delta(entity, spec, since)
+
+        async with AsyncSessionLocal() as session:
+            local_total: int = await crud_base.count_rows(session, spec.model)
+
+        if crm_total is not None and crm_total != local_total:
+            logger.warning(
+                f"Drift detected for {entity}: CRM has {crm_total} rows, "
+                f"local store has {local_total}. Running full sync"
+            )
+            return await self.sync_full(entity)
+
+        await self._save_watermark(entity, tracker, full=False)
+        return stats
+
+    @staticmethod
+    def _watermark_usable(watermark: Optional[SyncWatermark]) -> bool:
+        if watermark is None or watermark.last_full_sync_at is None:
+            return False
+        if watermark.last_id is None and watermark.last_modified is None:
+            return False
+
+        max_age = timedelta(hours=settings.crm_full_resync_hours)
+        return datetime.now(timezone.utc) - watermark.last_full_sync_at < max_age
+
+    async def _walk_delta(
+        self,
+        entity: str,
+        spec: EntitySpec,
+        since: Any
+    ) -> Tuple[SyncStats, Optional[int], "WatermarkTracker"]:
+        """
+        Идем по страницам от новых записей к старым, пока не встретим
+        записи старше watermark
+        """
+
+        stats = SyncStats(entity=f"{entity} (delta)")
+        sink: Sink = self._sink_for(entity)
+        tracker = WatermarkTracker(spec.cursor_field, since)
+        page_size: int = self._page_sizes.get(spec.endpoint, self.initial_page_size)
+        params: Dict[str, Any] = {**spec.params, "order": spec.delta_order}
+        crm_total: Optional[int] = None
+        page: int = 0
+
+        while True:
+            items, total = await self._fetch_page(
+                spec.endpoint,
+                params,
+                page,
+                page_size
+            )
+            if page == 0:
+                crm_total = total
+            if not items:
+                break
+
+            stats.pages += 1
+            fresh: List[Dict[str, Any]] = [
+                item for item in items
+                if tracker.is_newer(item)
+            ]
+            if fresh:
+                tracker.observe(fresh)
+                await sink(fresh)
+                stats.rows += len(fresh)
+
+            if len(fresh) < len(items) or len(items) < page_size:
+                break
+            page += 1
+
+        stats.finished_at = time.monotonic()
+        logger.info(
+            f"Synced {stats.entity}: {stats.rows} changed rows, "
+            f"{stats.pages} pages in {stats.elapsed:.1f}s"
+        )
+        return stats, crm_total, tracker
+
+    async def _save_watermark(
+        self,
+        entity: str,
+        tracker: "WatermarkTracker",
+        full: bool
+    ) -> None:
+        now: datetime = datetime.now(timezone.utc)
+        values: Dict[str, Any] = {"last_sync_at": now}
+        if full:
+            values["last_full_sync_at"] = now
+
+        if tracker.value is not None:
+            key = "last_id" if tracker.field == "id" else "last_modified"
+            values[key] = tracker.value
+
+        async with AsyncSessionLocal() as session:
+            await crud_sync.save_watermark(session, entity, values)
+            await session.commit()
+
+    # --- Sinks ---
+
+    async def _store_customers(
+        self,
+        customers: List[Dict[str, Any]],
+        bulk: bool = False
+    ) -> None:
+        rows: List[Dict[str, Any]] = [
+            CustomerRecord.from_crm(customer).to_row()
+            for customer in customers
+            if customer.get("id") is not None
+        ]
+        links: Dict[int, int] = {
+            row["telegram_id"]: row["id"]
+            for row in rows
+            if row["telegram_id"] is not None
+        }
+
+        async with AsyncSessionLocal() as session:
+            await crud_user.upsert_customers(session, rows, bulk=bulk)
+            await crud_user.upsert_telegram_links(session, links)
+            await session.commit()
+
+        self.client.invalidate_customers({row["id"] for row in rows})
+
+    async def _store_transactions(
+        self,
+        transactions: List[Dict[str, Any]],
+        bulk: bool = False
+    ) -> None:
+        rows: List[Dict[str, Any]] = [
+            TransactionRecord.from_crm(tx).to_row()
+            for tx in transactions
+            if tx.get("id") is not None
+        ]
+
+        async with AsyncSessionLocal() as session:
+            await crud_finance.upsert_transactions(session, rows, bulk=bulk)
+            await session.commit()
+
+        # Новая оплата меняет баланс и историю клиента
+        self.client.invalidate_customers({row["customer_id"] for row in rows})
+
+    # --- Pagination ---
+
+    async def _fetch_page(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        page: int,
+        page_size: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        response: Dict[str, Any] = await self.client.fetch_page(
+            endpoint,
+            page=page,
+            page_size=page_size,
+            params=params
+        )
+        total = response.get("total")
+        return response.get("items", []), int(total) if total is not None else None
+
+    def _adapt_page_size(
+        self,
+        endpoint: str,
+        page_size: int,
+        offset: int,
+        page_latency: float
+    ) -> int:
+        max_size: int = min(
+            self.max_page_size,
+            self._page_size_caps.get(endpoint, self.max_page_size)
+        )
+
+        # Увеличиваем страницу только на границе, кратной новому размеру,
+        # чтобы номера страниц не сдвинулись
+        if (
+            page_latency < self.target_page_latency / 2 and
+            page_size * 2 <= max_size and
+            offset % (page_size * 2) == 0
+        ):
+            return page_size * 2
+        if (
+            page_latency > self.target_page_latency and
+            page_size % 2 == 0 and
+            page_size // 2 >= self.min_page_size
+        ):
+            return page_size // 2
+        return page_size
+
+    async def _walk(
+        self,
+        entity: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        sink: Sink
+    ) -> SyncStats:
+        stats = SyncStats(entity=entity)
+        page_size: int = self._page_sizes.get(endpoint, self.initial_page_size)
+        offset: int = 0
+        pending_sink: Optional[asyncio.Task] = None
+
+        try:
+            while True:
+                first_page: int = offset // page_size
+                started: float = time.monotonic()
+                pages = await asyncio.gather(*(
+                    self._fetch_page(endpoint, params, first_page + i, page_size)
+                    for i in range(self.concurrency)
+                ))
+                page_latency: float = time.monotonic() - started
+
+                window: List[Dict[str, Any]] = []
+                done: bool = False
+                restart: bool = False
+                for i, (items, total) in enumerate(pages):
+                    if not items:
+                        done = True
+                        break
+
+                    stats.pages += 1
+                    window.extend(items)
+
+                    page_end: int = (first_page + i) * page_size + len(items)
+                    if len(items) < page_size:
+                        if total is not None and page_end < total:
+                            # CRM отдает страницы меньше запрошенного -
+                            # запоминаем предел и проходим заново
+                            self._page_size_caps[endpoint] = len(items)
+                            restart = True
+                        done = True
+                        break
+                    if total is not None and page_end >= total:
+                        done = True
+                        break
+
+                if pending_sink is not None:
+                    await pending_sink
+                    pending_sink = None
+                if window:
+                    stats.rows += len(window)
+                    pending_sink = asyncio.create_task(sink(window))
+
+                if restart:
+                    page_size = self._page_size_caps[endpoint]
+                    offset = 0
+                    logger.warning(
+                        f"AlfaCRM caps {endpoint} pages at {page_size} rows, "
+                        f"restarting {entity} sync"
+                    )
+                    continue
+                if done:
+                    break
+
+                offset += page_size * self.concurrency
+                page_size = self._adapt_page_size(
+                    endpoint,
+                    page_size,
+                    offset,
+                    page_latency
+                )
+
+            if pending_sink is not None:
+                await pending_sink
+                pending_sink = None
+        finally:
+            if pending_sink is not None:
+                pending_sink.cancel()
+
+        self._page_sizes[endpoint] = page_size
+        stats.finished_at = time.monotonic()
+        logger.info(
+            f"Synced {entity}: {stats.rows} rows, {stats.pages} pages "
+            f"in {stats.elapsed:.1f}s "
+            f"({stats.pages_per_sec:.1f} pages/s, "
+            f"{stats.rows_per_sec:.0f} rows/s, page size {page_size})"
+        )
+        return stats
+
+
+sync_engine = CRMSyncEngine(alfacrm_client)
+
+
+async def run_periodic_sync() -> None:
+    """
+    Фоновая инкрементальная синхронизация раз в crm_sync_interval_minutes.
+    Первый проход без watermark выполняет полную выгрузку
+    """
+
+    interval: float = settings.crm_sync_interval_minutes * 60
+    while True:
+        try:
+            # Синхронизация уступает квоту AlfaCRM запросам бота
+            with background():
+                await sync_engine.sync_all_incremental()
+            await finance_rollups.refresh()
+            await detect_balance_alerts()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Periodic CRM sync failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,101 @@
+# bot/alerts.py
+import asyncio
+import html
+import logging
+from typing import Any, Dict, List, Optional
+
+from backend_client import BackendClient
+from broadcast import FAILED, SENT, RateLimitedSender
+from texts import LOW_LESSONS_ALERT_TEXT, NEGATIVE_BALANCE_ALERT_TEXT
+
+logger = logging.getLogger(__name__)
+
+ALERT_TEXTS: Dict[str, str] = {
+    "low_lessons": LOW_LESSONS_ALERT_TEXT,
+    "negative_balance": NEGATIVE_BALANCE_ALERT_TEXT
+}
+
+
+class AlertNotifier:
+    """
+    Доставка уведомлений о низком балансе.
+
+    Backend сам находит клиентов ниже порога после синхронизации и хранит
+    по одному уведомлению на пересечение порога. Бот периодически забирает
+    неотправленные, рассылает их через общий RateLimitedSender и подтверждает
+    """
+
+    def __init__(
+        self,
+        backend_client: BackendClient,
+        sender: RateLimitedSender,
+        interval: float = 300.0,
+        batch_size: int = 100
+    ) -> None:
+        self.backend_client = backend_client
+        self.sender = sender
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def format_alert(alert: Dict[str, Any]) -> str:
+        return ALERT_TEXTS[alert["kind"]].format(
+            name=html.escape(alert.get("name") or "Ваш ребенок"),
+            paid_lessons=alert.get("paid_lessons", 0),
+            balance=alert.get("balance", 0)
+        )
+
+    async def deliver_pending(self) -> int:
+        delivered: int = 0
+        while True:
+            alerts: List[Dict[str, Any]] = await self.backend_client.get_pending_alerts(
+                limit=self.batch_size
+            )
+            if not alerts:
+                return delivered
+
+            results: List[str] = await asyncio.gather(*(
+                self.sender.deliver(alert["telegram_id"], self.format_alert(alert))
+                for alert in alerts
+            ))
+            delivered += results.count(SENT)
+
+            # Отклоненные Telegram (бот заблокирован) тоже подтверждаем,
+            # иначе они будут повторяться каждый цикл. Временные ошибки
+            # остаются в очереди до следующего цикла
+            acked: List[int] = [
+                alert["id"]
+                for alert, result in zip(alerts, results)
+                if result != FAILED
+            ]
+            if acked:
+                await self.backend_client.ack_alerts(acked)
+            if len(acked) < len(alerts):
+                logger.warning(
+                    f"{len(alerts) - len(acked)} balance alerts postponed "
+                    f"after delivery errors"
+                )
+                return delivered
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delivered: int = await self.deliver_pending()
+                if delivered:
+                    logger.info(f"Delivered {delivered} low balance alerts")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to deliver balance alerts: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
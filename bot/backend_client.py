@@ -1,18 +1,184 @@
+import bisect
 import logging
-from typing import Dict, Any
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
 
 import httpx
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def decode_json(response: httpx.Response) -> Any:
+    """
+    Разобрать тело ответа прямо из байтов (orjson, если установлен)
+    """
+
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+class LatencyHistogram:
+    """
+    Гистограмма времени ответа (мс) с фиксированными границами корзин
+    """
+
+    BUCKETS_MS: List[float] = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self) -> None:
+        # Последняя корзина - все, что больше последней границы
+        self.counts: List[int] = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total: int = 0
+        self.sum_ms: float = 0.0
+
+    def observe(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, latency_ms)] += 1
+        self.total += 1
+        self.sum_ms += latency_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={bound:g}" for bound in self.BUCKETS_MS]
+        labels.append(f">{self.BUCKETS_MS[-1]:g}")
+        return {
+            "count": self.total,
+            "avg_ms": self.sum_ms / self.total if self.total else 0.0,
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+@dataclass
+class CachedResponse:
+    data: Dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
 class BackendClient:
-    def __init__(self, base_url: str, token: str) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        cache_ttl: float = 300.0
+    ) -> None:
         self.base_url: str = base_url.rstrip("/")
         self.headers: Dict[str, str] = {"Authorization": f"Bearer {token}"}
         self.timeout: float = 30.0
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        # Время ответа по эндпойнтам (без query-параметров)
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.cache_ttl: float = cache_ttl
+        self._cache: Dict[str, CachedResponse] = {}
+        self._rules_version: Optional[str] = None
         logger.info(f"BackendClient initialized with base URL: {self.base_url}")
 
+    async def start(self) -> None:
+        """
+        Создать общий пул соединений с backend (keep-alive)
+        """
+
+        if self._client is not None:
+            return
+
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            limits=self.limits
+        )
+        logger.info("BackendClient connection pool started")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            await self.start()
+        return self._client
+
+    def _observe_latency(self, endpoint: str, started: float) -> None:
+        path: str = endpoint.split("?", 1)[0]
+        histogram = self.latency.setdefault(path, LatencyHistogram())
+        histogram.observe((time.perf_counter() - started) * 1000)
+
+    # --- Кэш редко меняющихся ответов (правила) ---
+
+    def _check_rules_version(self, response: httpx.Response) -> None:
+        """
+        Backend присылает версию правил в каждом ответе.
+        Если она изменилась - правила отредактированы, кэш сбрасывается
+        """
+
+        version: Optional[str] = response.headers.get("X-Rules-Version")
+        if version is None or version == self._rules_version:
+            return
+
+        if self._rules_version is not None:
+            logger.info(f"Rules version changed to {version}, dropping cache")
+            self.invalidate_cache()
+        self._rules_version = version
+
+    def invalidate_cache(self) -> None:
+        self._cache.clear()
+
+    async def _get_cached(self, endpoint: str) -> Dict[str, Any]:
+        """
+        GET с кэшем в памяти: в пределах TTL ответ берется из памяти,
+        после TTL - условный запрос с ETag/Last-Modified, на 304 ответ
+        продлевается без повторной загрузки
+        """
+
+        entry: Optional[CachedResponse] = self._cache.get(endpoint)
+        if entry is not None and time.monotonic() - entry.fetched_at < self.cache_ttl:
+            return entry.data
+
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response: httpx.Response = await self._send(
+            "GET",
+            endpoint,
+            headers=headers
+        )
+
+        # Кэш мог быть сброшен по X-Rules-Version во время запроса
+        entry = self._cache.get(endpoint)
+        if response.status_code == 304 and entry is not None:
+            entry.fetched_at = time.monotonic()
+            return entry.data
+        if response.status_code == 304:
+            # Кэш сброшен - загружаем заново без условий
+            response = await self._send("GET", endpoint)
+
+        data: Dict[str, Any] = decode_json(response)
+        self._cache[endpoint] = CachedResponse(
+            data=data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=time.monotonic()
+        )
+        return data
+
+    def latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            path: histogram.snapshot()
+            for path, histogram in self.latency.items()
+        }
+
     async def _make_request(
         self,
         method: str,
@@ -24,27 +190,44 @@ class BackendClient:
         Просто передать метод и эндпойнт и все
         """
 
-        url = f"{self.base_url}{endpoint}"
+        response: httpx.Response = await self._send(method, endpoint, **kwargs)
+        return decode_json(response)
 
-        # Добавляем заголовки если их нет
-        if 'headers' not in kwargs:
-            kwargs['headers'] = self.headers
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Выполнить запрос и вернуть ответ (304 Not Modified не считается ошибкой)
+        """
 
-        if 'timeout' not in kwargs:
-            kwargs['timeout'] = self.timeout
+        url = f"{self.base_url}{endpoint}"
+        # Заголовки и таймаут уже заданы в общем клиенте
+        client: httpx.AsyncClient = await self._get_client()
+        started: float = time.perf_counter()
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.request(method, url, **kwargs)
+            response = await client.request(method, url, **kwargs)
+            self._observe_latency(endpoint, started)
+
+            logger.debug(f"Request to {url}: {response.status_code}")
+
+            if response.status_code == 401:
+                logger.error(f"Authentication failed for {url}")
+                raise PermissionError("Ошибка авторизации на backend")
 
-                logger.debug(f"Request to {url}: {response.status_code}")
+            if response.status_code == 404:
+                raise LookupError(f"Не найдено: {endpoint}")
 
-                if response.status_code == 401:
-                    logger.error(f"Authentication failed for {url}")
-                    raise PermissionError("Ошибка авторизации на backend")
+            self._check_rules_version(response)
 
+            if response.status_code != 304:
                 response.raise_for_status()
-                return response.json()                
+            return response
+        except (PermissionError, LookupError):
+            raise
         except httpx.TimeoutException:
             logger.error(f"Timeout for {url}")
             raise RuntimeError("Таймаут при подключении к серверу")
@@ -66,44 +249,111 @@ class BackendClient:
             endpoint=f"/users/profile?telegram_id={telegram_id}"
         )
 
-    async def get_balance(self, telegram_id: int) -> Dict[str, Any]:
+    async def get_snapshot(self, telegram_id: int) -> Dict[str, Any]:
+        """
+        Профиль, баланс и группы пользователя одним запросом.
+        LookupError - пользователь не зарегистрирован
+        """
+
         return await self._make_request(
             method="GET",
-            endpoint=f"/finance/balance?telegram_id={telegram_id}"
+            endpoint=f"/users/snapshot?telegram_id={telegram_id}"
         )
 
-    async def get_finance_history(self, telegram_id: int) -> Dict[str, Any]:
+    async def get_balance(self, telegram_id: int) -> Dict[str, Any]:
         return await self._make_request(
             method="GET",
-            endpoint=f"/finance/history?telegram_id={telegram_id}"
+            endpoint=f"/finance/balance?telegram_id={telegram_id}"
         )
 
+    async def get_finance_history(
+        self,
+        telegram_id: int,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Одна страница истории финансов; cursor берется из next_cursor
+        или prev_cursor предыдущего ответа
+        """
+
+        endpoint: str = f"/finance/history?telegram_id={telegram_id}"
+        if cursor:
+            endpoint += f"&cursor={cursor}"
+        return await self._make_request(method="GET", endpoint=endpoint)
+
     async def get_bot_rules(self) -> Dict[str, str]:
-        return await self._make_request(
-            method="GET",
-            endpoint="/admin/rules/bot"
-        )
+        return await self._get_cached("/admin/rules/bot")
 
     async def get_school_rules(self) -> Dict[str, str]:
-        return await self._make_request(
+        return await self._get_cached("/admin/rules/school")
+
+    async def get_telegram_ids(
+        self,
+        after: Optional[int] = None,
+        limit: int = 500
+    ) -> Dict[str, Any]:
+        """
+        Страница получателей рассылки: {"telegram_ids": [...], "next_after": id}
+        """
+
+        endpoint: str = f"/users/telegram-ids?limit={limit}"
+        if after is not None:
+            endpoint += f"&after={after}"
+        return await self._make_request(method="GET", endpoint=endpoint)
+
+    async def get_pending_alerts(self, limit: int = 100) -> List[Dict[str, Any]]:
+        data = await self._make_request(
             method="GET",
-            endpoint="/admin/rules/school"
+            endpoint=f"/alerts/pending?limit={limit}"
         )
+        return data.get("alerts", [])
+
+    async def ack_alerts(self, ids: List[int]) -> int:
+        data = await self._make_request(
+            method="POST",
+            endpoint="/alerts/ack",
+            json={"ids": ids}
+        )
+        return data.get("acknowledged", 0)
+
+    async def send_to_director(
+        self,
+        telegram_id: int,
+        message: str,
+        idempotency_key: str,
+        user_name: str = "unknown"
+    ) -> bool:
+        """
+        Поставить сообщение в outbox backend. Ответ приходит сразу после
+        сохранения, доставку директору выполняет backend
+        """
 
-    async def send_to_director(self, telegram_id: int, message: str) -> bool:
         data = await self._make_request(
             method="POST",
             endpoint="/messages/director",
             json={
                 "telegram_id": telegram_id,
                 "message": message,
-                "user_name": "unknown"  # можно добавить из контекста
+                "user_name": user_name,
+                "idempotency_key": idempotency_key
             }
         )
         return data.get("success", False)
 
     async def close(self) -> None:
         """
-        Закрыть соединение (заглушка для совместимости)
+        Закрыть пул соединений
         """
-        pass
+
+        if self._client is None:
+            return
+
+        for path, stats in self.latency_stats().items():
+            logger.info(
+                f"Backend latency {path}: {stats['count']} requests, "
+                f"avg {stats['avg_ms']:.1f} ms, buckets {stats['buckets']}"
+            )
+
+        await self._client.aclose()
+        self._client = None
+        logger.info("BackendClient connection pool closed")
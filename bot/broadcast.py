@@ -0,0 +1,299 @@
+# bot/broadcast.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter
+)
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Integer, String, Table, Text, func, insert,
+    select, update
+)
+
+from backend_client import BackendClient
+from db import create_tables, engine, metadata
+
+logger = logging.getLogger(__name__)
+
+# Результат доставки сообщения
+SENT = "sent"
+# Повтор не поможет: бот заблокирован, чат не существует
+REJECTED = "rejected"
+# Временная ошибка: сеть или исчерпаны попытки после RetryAfter
+FAILED = "failed"
+
+broadcast_jobs = Table(
+    "broadcast_jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("text", Text, nullable=False),
+    Column("status", String(16), nullable=False, server_default="running"),
+    # Последний telegram_id, до которого рассылка уже дошла
+    Column("cursor", BigInteger, nullable=True),
+    Column("sent", Integer, nullable=False, server_default="0"),
+    Column("failed", Integer, nullable=False, server_default="0"),
+    Column("created_by", BigInteger, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column(
+        "updated_at",
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+)
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты: `rate` токенов в секунду, запас до `capacity`
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens: float = self.capacity
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """
+        Остановить выдачу токенов (например, после RetryAfter)
+        """
+
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now: float = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RateLimitedSender:
+    """
+    Отправка сообщений с учетом лимитов Telegram: общий лимит на бота
+    и отдельный лимит на каждый чат. При RetryAfter отправка приостанавливается
+    на указанное Telegram время и сообщение отправляется повторно.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float = 25.0,
+        per_chat_rate: float = 1.0,
+        max_retries: int = 3,
+        chats_limit: int = 10000
+    ) -> None:
+        self.bot = bot
+        self.global_bucket = TokenBucket(global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.max_retries = max_retries
+        self.chats_limit = chats_limit
+        self._chat_buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+
+        self.sent: int = 0
+        self.failed: int = 0
+        self.retry_after_hits: int = 0
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.per_chat_rate, capacity=1)
+            self._chat_buckets[chat_id] = bucket
+            if len(self._chat_buckets) > self.chats_limit:
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    async def send(self, chat_id: int, text: str, **kwargs: Any) -> bool:
+        return await self.deliver(chat_id, text, **kwargs) == SENT
+
+    async def deliver(self, chat_id: int, text: str, **kwargs: Any) -> str:
+        """
+        Отправить сообщение, вернуть SENT, REJECTED или FAILED
+        """
+
+        for attempt in range(self.max_retries + 1):
+            await self._chat_bucket(chat_id).acquire()
+            await self.global_bucket.acquire()
+
+            try:
+                await self.bot.send_message(chat_id, text, **kwargs)
+                self.sent += 1
+                return SENT
+            except TelegramRetryAfter as e:
+                self.retry_after_hits += 1
+                logger.warning(f"Telegram asked to retry after {e.retry_after}s")
+                self.global_bucket.pause(e.retry_after)
+            except (TelegramForbiddenError, TelegramBadRequest) as e:
+                # Бот заблокирован или чат не существует - повтор не поможет
+                logger.info(f"Cannot deliver to {chat_id}: {e}")
+                self.failed += 1
+                return REJECTED
+            except TelegramNetworkError as e:
+                logger.warning(f"Network error sending to {chat_id}: {e}")
+                await asyncio.sleep(2 ** attempt)
+
+        self.failed += 1
+        return FAILED
+
+
+class BroadcastEngine:
+    """
+    Рассылка по всем привязанным родителям.
+
+    Получатели читаются из индекса telegram_id страницами через backend,
+    после каждой страницы прогресс сохраняется в broadcast_jobs, поэтому
+    прерванная рассылка продолжается с места остановки.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        backend_client: BackendClient,
+        sender: RateLimitedSender,
+        page_size: int = 500,
+        concurrency: int = 20
+    ) -> None:
+        self.bot = bot
+        self.backend_client = backend_client
+        self.sender = sender
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def start(self, text: str, created_by: Optional[int] = None) -> int:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                insert(broadcast_jobs)
+                .values(text=text, created_by=created_by)
+                .returning(broadcast_jobs.c.id)
+            )
+            job_id: int = result.scalar_one()
+
+        self._spawn(job_id)
+        return job_id
+
+    async def resume(self) -> None:
+        """
+        Продолжить рассылки, прерванные остановкой бота
+        """
+
+        await create_tables()
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(broadcast_jobs.c.id)
+                .where(broadcast_jobs.c.status == "running")
+            )
+            job_ids: List[int] = list(result.scalars())
+
+        for job_id in job_ids:
+            logger.info(f"Resuming broadcast job {job_id}")
+            self._spawn(job_id)
+
+    async def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        async with engine.connect() as conn:
+            row = (await conn.execute(
+                select(broadcast_jobs).where(broadcast_jobs.c.id == job_id)
+            )).first()
+        return dict(row._mapping) if row is not None else None
+
+    async def stop(self) -> None:
+        # Задачи останавливаются, статус остается "running" для resume()
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def _spawn(self, job_id: int) -> None:
+        if job_id in self._tasks:
+            return
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _checkpoint(self, job_id: int, **values: Any) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(broadcast_jobs)
+                .where(broadcast_jobs.c.id == job_id)
+                .values(**values)
+            )
+
+    async def _run(self, job_id: int) -> None:
+        job: Optional[Dict[str, Any]] = await self.get_job(job_id)
+        if job is None:
+            return
+
+        cursor: Optional[int] = job["cursor"]
+        sent: int = job["sent"]
+        failed: int = job["failed"]
+        started: float = time.monotonic()
+        sent_this_run: int = 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(chat_id: int) -> bool:
+            async with semaphore:
+                return await self.sender.send(chat_id, job["text"])
+
+        try:
+            while True:
+                page: Dict[str, Any] = await self.backend_client.get_telegram_ids(
+                    after=cursor,
+                    limit=self.page_size
+                )
+                recipients: List[int] = page.get("telegram_ids", [])
+                if not recipients:
+                    break
+
+                results: List[bool] = await asyncio.gather(*(
+                    deliver(chat_id) for chat_id in recipients
+                ))
+                delivered: int = sum(results)
+                sent += delivered
+                failed += len(results) - delivered
+                sent_this_run += delivered
+                cursor = recipients[-1]
+
+                await self._checkpoint(job_id, cursor=cursor, sent=sent, failed=failed)
+                elapsed: float = time.monotonic() - started
+                logger.info(
+                    f"Broadcast {job_id}: sent {sent}, failed {failed}, "
+                    f"{sent_this_run / elapsed:.1f} msg/s"
+                )
+
+                if page.get("next_after") is None:
+                    break
+
+            await self._checkpoint(job_id, status="done")
+            logger.info(f"Broadcast {job_id} finished: sent {sent}, failed {failed}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast {job_id} failed: {e}")
+            await self._checkpoint(job_id, status="failed")
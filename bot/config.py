@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, HttpUrl, field_validator
 
@@ -8,17 +10,56 @@ class Settings(BaseSettings):
     telegram_admins: list[str] = Field(..., alias="TELEGRAM_ADMINS")
     directors_chat_id: str = Field(..., alias="DIRECTORS_CHAT_ID")
 
+    # --- Режим получения обновлений ---
+    bot_mode: Literal["polling", "webhook"] = Field(default="polling", alias="BOT_MODE")
+    webhook_base_url: Optional[HttpUrl] = Field(default=None, alias="WEBHOOK_BASE_URL")
+    webhook_path: str = Field(default="/webhook", alias="WEBHOOK_PATH")
+    # Обязателен в режиме webhook (проверяется при запуске)
+    webhook_secret: Optional[str] = Field(default=None, alias="WEBHOOK_SECRET")
+    webhook_host: str = Field(default="0.0.0.0", alias="WEBHOOK_HOST")
+    webhook_port: int = Field(default=8080, alias="WEBHOOK_PORT")
+    # Сколько обновлений обрабатывается одновременно
+    webhook_workers: int = Field(default=32, alias="WEBHOOK_WORKERS")
+    webhook_queue_size: int = Field(default=1000, alias="WEBHOOK_QUEUE_SIZE")
+
     # --- Backend ---
     backend_api_url: HttpUrl = Field(..., alias="BACKEND_API_URL")
     backend_api_token: str = Field(..., alias="BACKEND_API_TOKEN")
+    backend_max_connections: int = Field(default=20, alias="BACKEND_MAX_CONNECTIONS")
+    backend_max_keepalive_connections: int = Field(
+        default=10,
+        alias="BACKEND_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    backend_keepalive_expiry: float = Field(
+        default=30.0,
+        alias="BACKEND_KEEPALIVE_EXPIRY"
+    )
+    rules_cache_ttl: float = Field(default=300.0, alias="RULES_CACHE_TTL")
 
     # --- PostgreSQL ---
     database_url: str = Field(..., alias="DATABASE_URL")
 
+    # --- FSM storage ---
+    fsm_storage: Literal["memory", "postgres", "redis"] = Field(
+        default="memory",
+        alias="FSM_STORAGE"
+    )
+    redis_url: Optional[str] = Field(default=None, alias="REDIS_URL")
+    # Через сколько секунд без изменений состояние пользователя забывается
+    fsm_state_ttl: Optional[float] = Field(default=86400, alias="FSM_STATE_TTL")
+
     # --- AlfaCRM ---
     alfacrm_api_key: str = Field(..., alias="ALFACRM_API_KEY")
     alfacrm_base_url: HttpUrl = Field(..., alias="ALFACRM_BASE_URL")
 
+    # --- Рассылки ---
+    # Telegram разрешает около 30 сообщений в секунду на бота
+    # и 1 сообщение в секунду в один чат
+    broadcast_global_rate: float = Field(default=25.0, alias="BROADCAST_GLOBAL_RATE")
+    broadcast_per_chat_rate: float = Field(default=1.0, alias="BROADCAST_PER_CHAT_RATE")
+    # Как часто забирать из backend уведомления о низком балансе
+    alerts_poll_interval: float = Field(default=300.0, alias="ALERTS_POLL_INTERVAL")
+
     # --- Misc ---
     placeholder_qr_url: HttpUrl = Field(..., alias="PLACEHOLDER_QR_URL")
 
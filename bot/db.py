@@ -0,0 +1,30 @@
+# bot/db.py
+import logging
+
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# База нужна боту всегда: BroadcastEngine хранит в ней задания рассылки
+# (broadcast_jobs), даже если FSM использует MemoryStorage
+engine = create_async_engine(
+    settings.database_url,
+    pool_size=5,        # Бот делает короткие запросы, большой пул не нужен
+    max_overflow=5,
+    pool_pre_ping=True  # Проверка соединения перед использованием
+)
+
+metadata = MetaData()
+
+
+async def create_tables() -> None:
+    """
+    Создание таблиц бота в БД
+    """
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    logger.info("Bot database tables created")
@@ -0,0 +1,61 @@
+import logging
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from config import settings
+from loader import broadcast_engine
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+
+def is_admin(message: Message) -> bool:
+    return (
+        message.from_user is not None and
+        str(message.from_user.id) in settings.telegram_admins
+    )
+
+
+@router.message(Command("broadcast"), is_admin)
+async def start_broadcast(message: Message, command: CommandObject) -> None:
+    text: str = (command.args or "").strip()
+    if not text:
+        await message.answer(
+            "Использование: /broadcast <текст сообщения>\n"
+            "Сообщение получат все родители, привязанные к боту."
+        )
+        return
+
+    try:
+        job_id: int = await broadcast_engine.start(text, created_by=message.from_user.id)
+    except Exception as e:
+        logger.error(f"Failed to start broadcast: {e}")
+        await message.answer("⚠️ Не удалось запустить рассылку. Попробуйте позже.")
+        return
+
+    logger.info(f"Admin {message.from_user.id} started broadcast {job_id}")
+    await message.answer(
+        f"📣 Рассылка #{job_id} запущена.\n"
+        f"Статус: /broadcast_status {job_id}"
+    )
+
+
+@router.message(Command("broadcast_status"), is_admin)
+async def broadcast_status(message: Message, command: CommandObject) -> None:
+    if not command.args or not command.args.strip().isdigit():
+        await message.answer("Использование: /broadcast_status <номер рассылки>")
+        return
+
+    job = await broadcast_engine.get_job(int(command.args.strip()))
+    if job is None:
+        await message.answer("Рассылка не найдена.")
+        return
+
+    await message.answer(
+        f"📣 Рассылка #{job['id']}: <b>{job['status']}</b>\n"
+        f"Отправлено: {job['sent']}\n"
+        f"Не доставлено: {job['failed']}"
+    )
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+
+class FinancePage(CallbackData, prefix="fin"):
+    # Курсор backend (короткий, укладывается в 64 байта callback_data)
+    cursor: str
+
+
+def build_finance_pager(
+    prev_cursor: Optional[str],
+    next_cursor: Optional[str]
+) -> Optional[InlineKeyboardMarkup]:
+    if prev_cursor is None and next_cursor is None:
+        return None
+
+    kb = InlineKeyboardBuilder()
+    if prev_cursor is not None:
+        kb.button(text="◀️ Новее", callback_data=FinancePage(cursor=prev_cursor))
+    if next_cursor is not None:
+        kb.button(text="Старее ▶️", callback_data=FinancePage(cursor=next_cursor))
+    return kb.as_markup()
@@ -1,15 +1,33 @@
+from typing import FrozenSet, Tuple
+
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
-from aiogram.types import ReplyKeyboardMarkup
+from aiogram.types import ReplyKeyboardMarkup, ReplyKeyboardRemove
 
+MAIN_MENU_BUTTONS: Tuple[str, ...] = (
+    "Баланс",
+    "Оплата по QR",
+    "Правила бота",
+    "Правила школы",
+    "Кибероны",
+    "Финансы",
+    "Написать директору"
+)
+MAIN_MENU_TEXTS: FrozenSet[str] = frozenset(MAIN_MENU_BUTTONS)
 
-def build_main_menu() -> ReplyKeyboardMarkup:
+
+def _build_main_menu() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
-    kb.button(text="Баланс")
-    kb.button(text="Оплата по QR")
-    kb.button(text="Правила бота")
-    kb.button(text="Правила школы")
-    kb.button(text="Кибероны")
-    kb.button(text="Финансы")
-    kb.button(text="Написать директору")
+    for text in MAIN_MENU_BUTTONS:
+        kb.button(text=text)
     kb.adjust(3, 3, 1)
     return kb.as_markup(resize_keyboard=True)
+
+
+# Клавиатуры не меняются, поэтому строятся один раз при импорте
+# (объекты aiogram неизменяемы и безопасно переиспользуются)
+MAIN_MENU: ReplyKeyboardMarkup = _build_main_menu()
+REMOVE_KEYBOARD: ReplyKeyboardRemove = ReplyKeyboardRemove()
+
+
+def build_main_menu() -> ReplyKeyboardMarkup:
+    return MAIN_MENU
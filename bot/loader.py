@@ -0,0 +1,50 @@
+# bot/loader.py
+# Общие объекты бота. Вынесены из main.py, чтобы хендлеры могли
+# импортировать их без циклического импорта
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+
+from config import settings
+from backend_client import BackendClient, orjson
+from alerts import AlertNotifier
+from broadcast import BroadcastEngine, RateLimitedSender
+
+# Инициализация бота (ответы Bot API разбираются через orjson, если он есть)
+session = (
+    AiohttpSession(
+        json_loads=orjson.loads,
+        json_dumps=lambda value: orjson.dumps(value).decode()
+    )
+    if orjson is not None else AiohttpSession()
+)
+bot = Bot(
+    token=settings.telegram_bot_token,
+    session=session,
+    default=DefaultBotProperties(parse_mode="HTML")
+)
+
+# Инициализация BackendClient
+backend_client = BackendClient(
+    base_url=str(settings.backend_api_url),
+    token=settings.backend_api_token,
+    max_connections=settings.backend_max_connections,
+    max_keepalive_connections=settings.backend_max_keepalive_connections,
+    keepalive_expiry=settings.backend_keepalive_expiry,
+    cache_ttl=settings.rules_cache_ttl
+)
+
+# Рассылки: общий отправитель с учетом лимитов Telegram
+sender = RateLimitedSender(
+    bot,
+    global_rate=settings.broadcast_global_rate,
+    per_chat_rate=settings.broadcast_per_chat_rate
+)
+broadcast_engine = BroadcastEngine(bot, backend_client, sender)
+
+# Уведомления о низком балансе идут через тот же отправитель
+alert_notifier = AlertNotifier(
+    backend_client,
+    sender,
+    interval=settings.alerts_poll_interval
+)
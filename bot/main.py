@@ -1,13 +1,16 @@
 # bot/main.py
 import asyncio
 import logging
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.client.default import DefaultBotProperties
+from aiogram import Dispatcher
 
 from config import settings
+from handlers.admin_handlers import router as admin_router
 from handlers.main_handlers import router
-from backend_client import BackendClient
+from keyboards.main_menu_keyboard import MAIN_MENU_TEXTS
+from loader import alert_notifier, bot, backend_client, broadcast_engine
+from middlewares import UserQueueMiddleware
+from storage import build_storage, setup_storage
+from webhook import run_webhook
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,38 +22,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Инициализация бота
-bot = Bot(
-    token=settings.telegram_bot_token,
-    default=DefaultBotProperties(parse_mode="HTML")
-)
-dp = Dispatcher(storage=MemoryStorage())
-
-# Инициализация BackendClient
-backend_client = BackendClient(
-    base_url=str(settings.backend_api_url),
-    token=settings.backend_api_token
-)
+dp = Dispatcher(storage=build_storage())
+dp.update.outer_middleware(UserQueueMiddleware(button_texts=MAIN_MENU_TEXTS))
 
 
 async def main() -> None:
     try:
         logger.info("Starting bot...")
+        await backend_client.start()
+        await setup_storage(dp.storage)
 
-        # Подключаем роутеры
+        # Подключаем роутеры (админские команды раньше общих хендлеров)
+        dp.include_router(admin_router)
         dp.include_router(router)
 
-        logger.info("Bot initialized successfully. Starting polling...")
-        await dp.start_polling(bot)
+        try:
+            await broadcast_engine.resume()
+        except Exception as e:
+            logger.error(f"Failed to resume broadcasts: {e}")
+        alert_notifier.start()
+
+        if settings.bot_mode == "webhook":
+            logger.info("Bot initialized successfully. Starting webhook...")
+            await run_webhook(dp, bot)
+        else:
+            logger.info("Bot initialized successfully. Starting polling...")
+            await dp.start_polling(bot)
     except Exception as e:
         logger.error(f"Failed to start bot: {e}")
         raise
     finally:
         # Закрытие соединений
-        if hasattr(backend_client, 'close'):
-            await backend_client.close()
+        await alert_notifier.stop()
+        await broadcast_engine.stop()
+        await backend_client.close()
+        await dp.storage.close()
         logger.info("Bot stopped")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -0,0 +1,3 @@
+from middlewares.user_queue import UserQueueMiddleware
+
+__all__ = ["UserQueueMiddleware"]
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import (
+    Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+)
+
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import TelegramObject, Update, User
+
+logger = logging.getLogger(__name__)
+
+PressKey = Tuple[int, str, str]
+
+
+class UserQueueMiddleware(BaseMiddleware):
+    """
+    Outer middleware на обновления:
+    - отбрасывает повторно доставленные update_id;
+    - обрабатывает обновления одного пользователя строго по очереди;
+    - схлопывает одинаковые нажатия (текст кнопки из `button_texts`,
+      callback data), которые еще ждут в очереди, - выполняется только
+      одно из них. Произвольный текст не схлопывается: два одинаковых
+      сообщения директору - это два сообщения;
+    - не держит в очереди одного пользователя больше `max_queue_depth`
+      обновлений, чтобы он не занял все обработчики вебхука.
+    """
+
+    def __init__(
+        self,
+        button_texts: Iterable[str] = (),
+        max_queue_depth: int = 5,
+        seen_updates_limit: int = 10000
+    ) -> None:
+        self.button_texts: FrozenSet[str] = frozenset(button_texts)
+        self.max_queue_depth = max_queue_depth
+        self.seen_updates_limit = seen_updates_limit
+        self._seen_updates: "OrderedDict[int, None]" = OrderedDict()
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._queued: Dict[int, int] = {}
+        self._pending: Set[PressKey] = set()
+
+        self.duplicates_dropped: int = 0
+        self.presses_merged: int = 0
+        self.overflow_dropped: int = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "duplicates_dropped": self.duplicates_dropped,
+            "presses_merged": self.presses_merged,
+            "overflow_dropped": self.overflow_dropped,
+            "users_in_queue": len(self._locks)
+        }
+
+    def _is_duplicate(self, update_id: int) -> bool:
+        if update_id in self._seen_updates:
+            return True
+
+        self._seen_updates[update_id] = None
+        if len(self._seen_updates) > self.seen_updates_limit:
+            self._seen_updates.popitem(last=False)
+        return False
+
+    def _press_key(self, user_id: int, update: Update) -> Optional[PressKey]:
+        if (
+            update.message is not None and
+            update.message.text in self.button_texts
+        ):
+            return user_id, "message", update.message.text
+        if update.callback_query is not None and update.callback_query.data:
+            return user_id, "callback", update.callback_query.data
+        return None
+
+    @staticmethod
+    async def _answer_dropped(update: Update) -> None:
+        # Отброшенный callback все равно нужно подтвердить,
+        # иначе у кнопки крутится индикатор загрузки до таймаута
+        if update.callback_query is None:
+            return
+        try:
+            await update.callback_query.answer()
+        except TelegramAPIError as e:
+            logger.debug(f"Failed to answer dropped callback: {e}")
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+
+        if self._is_duplicate(event.update_id):
+            self.duplicates_dropped += 1
+            logger.debug(f"Dropped duplicate update {event.update_id}")
+            return None
+
+        user: Optional[User] = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        key: Optional[PressKey] = self._press_key(user.id, event)
+        if key is not None and key in self._pending:
+            self.presses_merged += 1
+            logger.debug(f"Merged repeated press from user {user.id}")
+            await self._answer_dropped(event)
+            return None
+
+        if self._queued.get(user.id, 0) >= self.max_queue_depth:
+            self.overflow_dropped += 1
+            logger.warning(f"Queue of user {user.id} is full, update dropped")
+            await self._answer_dropped(event)
+            return None
+
+        lock: asyncio.Lock = self._locks.setdefault(user.id, asyncio.Lock())
+        self._queued[user.id] = self._queued.get(user.id, 0) + 1
+        if key is not None:
+            self._pending.add(key)
+
+        try:
+            async with lock:
+                # Нажатие начало выполняться - следующее такое же снова
+                # встанет в очередь, а не схлопнется с этим
+                if key is not None:
+                    self._pending.discard(key)
+                return await handler(event, data)
+        finally:
+            if key is not None:
+                self._pending.discard(key)
+            self._queued[user.id] -= 1
+            if self._queued[user.id] == 0:
+                del self._queued[user.id]
+                del self._locks[user.id]
@@ -0,0 +1,48 @@
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config import settings
+
+
+def build_storage() -> BaseStorage:
+    """
+    FSM-хранилище по настройке FSM_STORAGE: memory, postgres или redis
+    """
+
+    if settings.fsm_storage == "postgres":
+        from db import engine
+        from storage.postgres import PostgresStorage
+
+        return PostgresStorage(engine, state_ttl=settings.fsm_state_ttl)
+
+    if settings.fsm_storage == "redis":
+        if not settings.redis_url:
+            raise ValueError("REDIS_URL is required for FSM_STORAGE=redis")
+        try:
+            from aiogram.fsm.storage.redis import RedisStorage
+        except ImportError as e:
+            raise RuntimeError(
+                "FSM_STORAGE=redis requires the redis package"
+            ) from e
+
+        ttl = int(settings.fsm_state_ttl) if settings.fsm_state_ttl else None
+        return RedisStorage.from_url(
+            settings.redis_url,
+            state_ttl=ttl,
+            data_ttl=ttl
+        )
+
+    return MemoryStorage()
+
+
+async def setup_storage(storage: BaseStorage) -> None:
+    """
+    Подготовить хранилище к работе (создать таблицы для Postgres)
+    """
+
+    from storage.postgres import PostgresStorage
+
+    if isinstance(storage, PostgresStorage):
+        from db import create_tables
+
+        await create_tables()
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy import (
+    Column, DateTime, Table, Text, and_, case, delete, func, literal, null, or_,
+    select
+)
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from db import metadata
+
+logger = logging.getLogger(__name__)
+
+fsm_states = Table(
+    "fsm_states",
+    metadata,
+    Column("key", Text, primary_key=True),
+    Column("state", Text, nullable=True),
+    Column("data", JSONB, nullable=False, server_default="{}"),
+    Column("expires_at", DateTime(timezone=True), nullable=True, index=True)
+)
+
+
+class PostgresStorage(BaseStorage):
+    """
+    FSM-хранилище в Postgres, общее для нескольких процессов бота.
+
+    Состояние и данные пользователя лежат в одной строке: get_state и
+    get_data читают ее одним запросом (одновременные чтения одного ключа
+    объединяются), update_data сливает данные на стороне БД одним UPSERT.
+    Каждая запись продлевает срок жизни строки на `state_ttl` секунд,
+    просроченные строки не читаются и периодически удаляются.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        state_ttl: Optional[float] = None,
+        cleanup_interval: float = 600.0
+    ) -> None:
+        self.engine = engine
+        self.state_ttl = state_ttl
+        self.cleanup_interval = cleanup_interval
+        self._reads: Dict[str, asyncio.Task] = {}
+        self._last_cleanup: float = time.monotonic()
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return ":".join(
+            str(part) if part is not None else ""
+            for part in (
+                key.bot_id,
+                key.chat_id,
+                key.user_id,
+                key.thread_id,
+                key.business_connection_id,
+                key.destiny
+            )
+        )
+
+    def _expires_at(self) -> Optional[datetime]:
+        if self.state_ttl is None:
+            return None
+        return datetime.now(timezone.utc) + timedelta(seconds=self.state_ttl)
+
+    # --- Чтение ---
+
+    async def _read(self, key: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        task = self._reads.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key))
+            self._reads[key] = task
+            task.add_done_callback(lambda done: self._forget_read(key, done))
+        return await asyncio.shield(task)
+
+    def _forget_read(self, key: str, task: asyncio.Task) -> None:
+        if self._reads.get(key) is task:
+            del self._reads[key]
+
+    async def _fetch(self, key: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        query = select(fsm_states.c.state, fsm_states.c.data).where(
+            fsm_states.c.key == key,
+            or_(
+                fsm_states.c.expires_at.is_(None),
+                fsm_states.c.expires_at > func.now()
+            )
+        )
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(query)).first()
+
+        if row is None:
+            return None, {}
+        return row.state, dict(row.data or {})
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self._read(self._key(key))
+        return state
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self._read(self._key(key))
+        return data
+
+    # --- Запись ---
+
+    async def _write(
+        self,
+        key: str,
+        values: Dict[str, Any],
+        merge: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        # Чтение, начатое до записи, не должно достаться следующим вызовам
+        self._reads.pop(key, None)
+
+        values = {**values, "expires_at": self._expires_at()}
+        stmt = insert(fsm_states).values(key=key, **values)
+        update_set: Dict[str, Any] = {
+            column: stmt.excluded[column] for column in values
+        }
+
+        # Просроченная строка не должна "воскреснуть" частично:
+        # незаписываемые поля сбрасываются, слияние идет с пустыми данными
+        expired = and_(
+            fsm_states.c.expires_at.isnot(None),
+            fsm_states.c.expires_at <= func.now()
+        )
+        if merge:
+            update_set["data"] = case(
+                (expired, stmt.excluded.data),
+                else_=fsm_states.c.data.op("||")(stmt.excluded.data)
+            )
+        update_set.setdefault(
+            "data",
+            case((expired, literal({}, JSONB)), else_=fsm_states.c.data)
+        )
+        update_set.setdefault(
+            "state",
+            case((expired, null()), else_=fsm_states.c.state)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[fsm_states.c.key],
+            set_=update_set
+        ).returning(fsm_states.c.data)
+
+        async with self.engine.begin() as conn:
+            row = (await conn.execute(stmt)).first()
+
+        await self._maybe_cleanup()
+        return dict(row.data) if row is not None else None
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        value: Optional[str] = state.state if isinstance(state, State) else state
+        await self._write(self._key(key), {"state": value})
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._write(self._key(key), {"data": dict(data)})
+
+    async def update_data(
+        self,
+        key: StorageKey,
+        data: Mapping[str, Any]
+    ) -> Dict[str, Any]:
+        # Слияние на стороне БД: один запрос вместо чтения и записи
+        merged = await self._write(
+            self._key(key),
+            {"data": dict(data)},
+            merge=True
+        )
+        return merged if merged is not None else dict(data)
+
+    # --- Обслуживание ---
+
+    async def _maybe_cleanup(self) -> None:
+        if self.state_ttl is None:
+            return
+        if time.monotonic() - self._last_cleanup < self.cleanup_interval:
+            return
+
+        self._last_cleanup = time.monotonic()
+        try:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(
+                    delete(fsm_states).where(fsm_states.c.expires_at < func.now())
+                )
+            if result.rowcount:
+                logger.info(f"Removed {result.rowcount} expired FSM states")
+        except Exception as e:
+            logger.error(f"Failed to clean up expired FSM states: {e}")
+
+    async def close(self) -> None:
+        await self.engine.dispose()
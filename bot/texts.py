@@ -0,0 +1,121 @@
+# bot/texts.py
+# Статические тексты сообщений. Собраны в одном модуле и создаются
+# один раз при импорте, хендлеры только ссылаются на них
+from functools import lru_cache
+
+BOT_RULES_TITLE: str = "📋 <b>Правила использования бота</b>"
+SCHOOL_RULES_TITLE: str = "🏫 <b>Правила школы KIBERone</b>"
+
+QR_PAYMENT_TEXT: str = (
+    "💳 <b>Оплата по QR</b>\n\n"
+    "🔧 Раздел в разработке. QR-код будет доступен позже.\n\n"
+    "Для оплаты вы можете:\n"
+    "1. Обратиться к администратору в школе\n"
+    "2. Использовать банковский перевод\n"
+    "3. Оплатить наличными в офисе\n\n"
+    "<i>Онлайн-оплата появится в ближайшее время!</i>"
+)
+
+DEFAULT_BOT_RULES_TEXT: str = (
+    "ℹ️ <b>Правила использования бота</b>\n\n"
+    "1. Бот предназначен только для клиентов KIBERone\n"
+    "2. Запрещено спамить и использовать нецензурную лексику\n"
+    "3. Конфиденциальные данные не передаются третьим лицам\n"
+    "4. Администрация оставляет за собой право блокировки\n\n"
+    "<i>Полная версия правил скоро будет доступна</i>"
+)
+
+DEFAULT_SCHOOL_RULES_TEXT: str = (
+    "🏫 <b>Правила школы KIBERone</b>\n\n"
+    "Основные правила:\n\n"
+    "✅ <b>Посещение занятий:</b>\n"
+    "• Опоздание не более 15 минут\n"
+    "• Предупреждать об отсутствии за 24 часа\n"
+    "• Иметь сменную обувь\n\n"
+    "✅ <b>Поведение:</b>\n"
+    "• Уважительное отношение к преподавателям\n"
+    "• Бережное обращение с оборудованием\n"
+    "• Соблюдение чистоты в классах\n\n"
+    "✅ <b>Оплата:</b>\n"
+    "• Оплата до 10 числа каждого месяца\n"
+    "• Возврат средств за пропущенные занятия не предусмотрен\n"
+    "• Возможна заморозка абонемента по уважительной причине\n\n"
+    "<i>Полная версия правил доступна у администратора</i>"
+)
+
+CYBERONS_TEXT: str = """
+🪙 <b>Кибероны - внутренняя валюта KIBERone</b>
+
+🎯 <b>Как начисляются кибероны:</b>
+• 1 киберон = 1 посещенное занятие
+• +5 киберонов за приведенного друга
+• +10 киберонов за отличную учебу (оценка 5)
+• +15 киберонов за участие в конкурсах
+• +20 киберонов за победу в олимпиаде
+
+💰 <b>Как можно потратить кибероны:</b>
+• 10 киберонов = 1 дополнительное занятие
+• 25 киберонов = мерч KIBERone (футболка)
+• 50 киберонов = участие в мастер-классе
+• 100 киберонов = скидка 20% на следующий месяц
+• 150 киберонов = бесплатный месяц обучения
+
+📜 <b>Основные правила:</b>
+1. Кибероны действуют в течение учебного года
+2. Не подлежат обмену на денежные средства
+3. Накопленные кибероны отображаются в разделе "Баланс"
+4. Списываются автоматически при использовании
+
+👨‍💻 <b>Текущий курс:</b>
+1 киберон = 50 рублей (номинальная стоимость)
+
+<i>Точные условия начисления и списания уточняйте у администратора школы.</i>
+"""
+
+DIRECTOR_PROMPT_TEXT: str = (
+    "✍️ <b>Написать директору</b>\n\n"
+    "Пожалуйста, напишите ваше сообщение для директора школы.\n\n"
+    "<b>Что можно написать:</b>\n"
+    "• Предложения по улучшению работы школы\n"
+    "• Жалобы или замечания\n"
+    "• Благодарности преподавателям\n"
+    "• Идеи для новых курсов\n\n"
+    "<i>Сообщение будет прочитано лично директором.\n"
+    "Ответ поступит в течение 24 часов.\n\n"
+    "Для отмены отправьте /cancel</i>"
+)
+
+# Совпадает с max_length DirectorMessageCreate.message в backend
+DIRECTOR_MESSAGE_MAX_LENGTH: int = 3500
+
+DIRECTOR_MESSAGE_TOO_LONG_TEXT: str = (
+    "❌ Сообщение слишком длинное ({length} символов). "
+    "Пожалуйста, сократите его до {limit} символов и отправьте снова."
+)
+
+STALE_DATA_TEXT: str = (
+    "<i>⚠️ CRM школы временно недоступна, показаны последние "
+    "сохраненные данные</i>"
+)
+
+LOW_LESSONS_ALERT_TEXT: str = (
+    "🔔 <b>{name}: заканчиваются оплаченные занятия</b>\n\n"
+    "🎓 Осталось занятий: <b>{paid_lessons}</b>\n\n"
+    "Пополнить баланс можно через раздел «Оплата по QR»."
+)
+
+NEGATIVE_BALANCE_ALERT_TEXT: str = (
+    "🔔 <b>{name}: отрицательный баланс</b>\n\n"
+    "📊 Баланс: <b>{balance} руб.</b>\n\n"
+    "Пополнить баланс можно через раздел «Оплата по QR»."
+)
+
+
+@lru_cache(maxsize=8)
+def format_rules(title: str, rules_text: str) -> str:
+    """
+    Текст правил с заголовком. Правила меняются редко,
+    поэтому готовое сообщение переиспользуется
+    """
+
+    return f"{title}\n\n{rules_text}"
@@ -0,0 +1,178 @@
+# bot/webhook.py
+import asyncio
+import hmac
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+
+from backend_client import orjson
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Допустимый формат secret_token по документации Bot API
+SECRET_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,256}")
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+class WebhookServer:
+    """
+    Прием обновлений от Telegram через webhook.
+
+    HTTP-обработчик только кладет обновление в ограниченную очередь и сразу
+    отвечает 200, а хендлеры выполняются пулом из `workers` фоновых задач.
+    Если очередь переполнена, отвечаем 503 - Telegram повторит доставку.
+    Запросы без верного секрета отклоняются, иначе любой, кто знает адрес,
+    мог бы подсовывать боту обновления от имени пользователей.
+    """
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        path: str,
+        secret: str,
+        workers: int = 32,
+        queue_size: int = 1000
+    ) -> None:
+        self.dp = dp
+        self.bot = bot
+        self.path = path
+        self.secret = secret
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._runner: Optional[web.AppRunner] = None
+
+        self.received: int = 0
+        self.rejected: int = 0
+        self.processed: int = 0
+        self.failed: int = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "received": self.received,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        received: str = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(received.encode(), self.secret.encode()):
+            return web.Response(status=401)
+
+        try:
+            data: Dict[str, Any] = await request.json(loads=json_loads)
+        except ValueError:
+            return web.Response(status=400)
+
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning("Webhook queue is full, asking Telegram to retry")
+            return web.Response(status=503)
+
+        self.received += 1
+        return web.Response()
+
+    async def _worker(self) -> None:
+        while True:
+            data: Dict[str, Any] = await self.queue.get()
+            try:
+                update = Update.model_validate(data, context={"bot": self.bot})
+                await self.dp.feed_update(self.bot, update)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to process update {data.get('update_id')}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def start(self, host: str, port: int, base_url: str) -> None:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+        self._tasks = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.workers)
+        ]
+
+        await self.bot.set_webhook(
+            url=base_url.rstrip("/") + self.path,
+            secret_token=self.secret,
+            allowed_updates=self.dp.resolve_used_update_types(),
+            max_connections=100,
+            drop_pending_updates=False
+        )
+        logger.info(
+            f"Webhook server listening on {host}:{port}{self.path} "
+            f"with {self.workers} workers"
+        )
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        # Сначала перестаем принимать новые обновления
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.queue.qsize()} updates left unprocessed")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"Webhook server stopped: {self.stats()}")
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """
+    Запустить бота в режиме webhook и работать до отмены
+    """
+
+    if settings.webhook_base_url is None:
+        raise ValueError("WEBHOOK_BASE_URL is required for BOT_MODE=webhook")
+    if not settings.webhook_secret:
+        raise ValueError("WEBHOOK_SECRET is required for BOT_MODE=webhook")
+    if not SECRET_PATTERN.fullmatch(settings.webhook_secret):
+        raise ValueError(
+            "WEBHOOK_SECRET must be 1-256 characters: A-Z, a-z, 0-9, _ and -"
+        )
+
+    server = WebhookServer(
+        dp,
+        bot,
+        path=settings.webhook_path,
+        secret=settings.webhook_secret,
+        workers=settings.webhook_workers,
+        queue_size=settings.webhook_queue_size
+    )
+
+    await dp.emit_startup(bot=bot, dispatcher=dp, **dp.workflow_data)
+    await server.start(
+        host=settings.webhook_host,
+        port=settings.webhook_port,
+        base_url=str(settings.webhook_base_url)
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        await dp.emit_shutdown(bot=bot, dispatcher=dp, **dp.workflow_data)
+        await bot.session.close()
@@ -0,0 +1,117 @@
+"""
+Бенчмарк HTTP-транспорта AlfaCRMClient на локальной заглушке CRM.
+
+Сравнивает старый способ (новый httpx.AsyncClient на каждый запрос)
+с общим пулом соединений, как в AlfaCRMClient.start(). Заглушка
+отвечает как /customer/index и считает открытые TCP-соединения.
+TLS локально не используется, поэтому на реальном HTTPS-хосте
+разница будет больше.
+
+    python scripts/bench_alfacrm_pool.py --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import httpx
+from aiohttp import web
+
+PATH = "/v2api/1/customer/index"
+RESPONSE: Dict[str, Any] = {
+    "total": 1,
+    "count": 1,
+    "page": 0,
+    "items": [{"id": 1, "name": "Иванов Петр", "balance": {"balance": "1500.00"}}]
+}
+
+
+class StubCRM:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.connections: Set[Tuple[str, int]] = set()
+        self._runner: Optional[web.AppRunner] = None
+        self.url: str = ""
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.connections.add(request.transport.get_extra_info("peername"))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response(RESPONSE)
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get(PATH, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", 0).start()
+        port: int = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}{PATH}"
+
+    async def close(self) -> None:
+        await self._runner.cleanup()
+
+
+async def run(
+    total: int,
+    concurrency: int,
+    request: Callable[[], Awaitable[None]]
+) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            await request()
+
+    started: float = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    stub = StubCRM(latency=args.latency)
+    await stub.start()
+    params: Dict[str, Any] = {"id": 1, "with": "balance"}
+
+    async def per_call() -> None:
+        # Как было: клиент и соединение на каждый запрос
+        async with httpx.AsyncClient() as client:
+            response = await client.get(stub.url, params=params)
+            response.raise_for_status()
+            response.json()
+
+    pooled_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=args.max_connections,
+            max_keepalive_connections=args.max_keepalive,
+            keepalive_expiry=30.0
+        )
+    )
+
+    async def pooled() -> None:
+        response = await pooled_client.get(stub.url, params=params)
+        response.raise_for_status()
+        response.json()
+
+    try:
+        for name, request in (("client per call", per_call), ("shared pool", pooled)):
+            stub.connections.clear()
+            elapsed: float = await run(args.requests, args.concurrency, request)
+            print(
+                f"{name:>16}: {args.requests / elapsed:8.0f} req/s, "
+                f"{elapsed:6.2f}s, {len(stub.connections)} TCP connections"
+            )
+    finally:
+        await pooled_client.aclose()
+        await stub.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="задержка ответа заглушки, сек.")
+    parser.add_argument("--max-connections", type=int, default=20)
+    parser.add_argument("--max-keepalive", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,248 @@
+"""
+Проверка рассылки (bot/broadcast.py) на локальной заглушке Bot API.
+
+Заглушка ведет себя как Telegram: больше `--api-global-limit` сообщений
+в секунду на бота или чаще раза в секунду в один чат - ответ 429
+с retry_after, каждый `--blocked-every`-й чат заблокировал бота (403).
+Заглушка считает нарушения лимитов, которые допустил отправитель.
+
+По умолчанию получатели рассылаются через RateLimitedSender так же,
+как это делает BroadcastEngine (страницами, с ограничением параллельности).
+С флагом --engine запускается сам BroadcastEngine с фиктивным backend:
+нужен Postgres из DATABASE_URL (таблица broadcast_jobs), в конце
+проверяется сохраненный прогресс задания.
+
+    python scripts/bench_broadcast.py --recipients 2000
+    DATABASE_URL=postgresql+asyncpg://... python scripts/bench_broadcast.py --engine
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "bot"))
+
+# Обязательные настройки бота; реальные значения для теста не нужны
+for name, value in {
+    "TELEGRAM_BOT_TOKEN": "123456:broadcast",
+    "TELEGRAM_ADMINS": "[]",
+    "DIRECTORS_CHAT_ID": "0",
+    "BACKEND_API_URL": "http://127.0.0.1:9/",
+    "BACKEND_API_TOKEN": "broadcast",
+    "DATABASE_URL": "postgresql+asyncpg://localhost/broadcast",
+    "ALFACRM_API_KEY": "broadcast",
+    "ALFACRM_BASE_URL": "http://127.0.0.1:9/",
+    "PLACEHOLDER_QR_URL": "http://127.0.0.1:9/qr.png"
+}.items():
+    os.environ.setdefault(name, value)
+
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from broadcast import BroadcastEngine, RateLimitedSender  # noqa: E402
+
+FIRST_CHAT_ID = 100000
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeBotAPI:
+    """
+    Заглушка sendMessage с лимитами Telegram
+    """
+
+    def __init__(self, global_limit: int, blocked_every: int, latency: float) -> None:
+        self.global_limit = global_limit
+        self.blocked_every = blocked_every
+        self.latency = latency
+        self._recent: Deque[float] = deque()
+        self._last_in_chat: Dict[int, float] = {}
+        self._runner = web.AppRunner(web.Application())
+        self.url: str = ""
+
+        self.delivered: Dict[int, int] = defaultdict(int)
+        self.throttled: int = 0
+        self.blocked: int = 0
+
+    @staticmethod
+    def _error(status: int, description: str, **parameters: Any) -> web.Response:
+        body: Dict[str, Any] = {
+            "ok": False,
+            "error_code": status,
+            "description": description
+        }
+        if parameters:
+            body["parameters"] = parameters
+        return web.json_response(body, status=status)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        chat_id: int = int(data["chat_id"])
+        now: float = time.monotonic()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.blocked_every and (chat_id - FIRST_CHAT_ID) % self.blocked_every == 0:
+            self.blocked += 1
+            return self._error(403, "Forbidden: bot was blocked by the user")
+
+        while self._recent and now - self._recent[0] >= 1.0:
+            self._recent.popleft()
+        last: Optional[float] = self._last_in_chat.get(chat_id)
+        if len(self._recent) >= self.global_limit or (last is not None and now - last < 1.0):
+            self.throttled += 1
+            return self._error(429, "Too Many Requests: retry after 1", retry_after=1)
+
+        self._recent.append(now)
+        self._last_in_chat[chat_id] = now
+        self.delivered[chat_id] += 1
+        return web.json_response({"ok": True, "result": {
+            "message_id": sum(self.delivered.values()),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": data.get("text", "")
+        }})
+
+    async def start(self) -> None:
+        self._runner.app.router.add_post("/bot{token}/sendMessage", self.handle)
+        await self._runner.setup()
+        port: int = free_port()
+        await web.TCPSite(self._runner, "127.0.0.1", port).start()
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def close(self) -> None:
+        await self._runner.cleanup()
+
+
+class FakeBackend:
+    """
+    Страницы индекса telegram_id, как BackendClient.get_telegram_ids
+    """
+
+    def __init__(self, recipients: List[int]) -> None:
+        self.recipients = recipients
+
+    async def get_telegram_ids(self, after: Optional[int], limit: int) -> Dict[str, Any]:
+        page: List[int] = [
+            chat_id for chat_id in self.recipients
+            if after is None or chat_id > after
+        ][:limit]
+        next_after: Optional[int] = (
+            page[-1] if page and page[-1] != self.recipients[-1] else None
+        )
+        return {"telegram_ids": page, "next_after": next_after}
+
+
+async def run_sender(
+    sender: RateLimitedSender,
+    backend: FakeBackend,
+    page_size: int,
+    concurrency: int
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def deliver(chat_id: int) -> bool:
+        async with semaphore:
+            return await sender.send(chat_id, "Напоминание об оплате")
+
+    cursor: Optional[int] = None
+    while True:
+        page: Dict[str, Any] = await backend.get_telegram_ids(after=cursor, limit=page_size)
+        if not page["telegram_ids"]:
+            break
+        await asyncio.gather(*(deliver(chat_id) for chat_id in page["telegram_ids"]))
+        cursor = page["telegram_ids"][-1]
+        if page["next_after"] is None:
+            break
+
+
+async def run_engine(
+    bot: Bot,
+    sender: RateLimitedSender,
+    backend: FakeBackend,
+    page_size: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    engine = BroadcastEngine(
+        bot,
+        backend,
+        sender,
+        page_size=page_size,
+        concurrency=concurrency
+    )
+    await engine.resume()  # создает таблицу broadcast_jobs
+    job_id: int = await engine.start("Напоминание об оплате")
+    while True:
+        await asyncio.sleep(0.5)
+        job: Dict[str, Any] = await engine.get_job(job_id)
+        if job["status"] != "running":
+            return job
+
+
+async def main(args: argparse.Namespace) -> None:
+    api = FakeBotAPI(args.api_global_limit, args.blocked_every, args.api_latency)
+    await api.start()
+    bot = Bot(
+        token=os.environ["TELEGRAM_BOT_TOKEN"],
+        session=AiohttpSession(api=TelegramAPIServer.from_base(api.url))
+    )
+    sender = RateLimitedSender(
+        bot,
+        global_rate=args.global_rate,
+        per_chat_rate=args.per_chat_rate
+    )
+    recipients: List[int] = list(range(FIRST_CHAT_ID, FIRST_CHAT_ID + args.recipients))
+    backend = FakeBackend(recipients)
+
+    job: Optional[Dict[str, Any]] = None
+    started: float = time.perf_counter()
+    try:
+        if args.engine:
+            job = await run_engine(bot, sender, backend, args.page_size, args.concurrency)
+        else:
+            await run_sender(sender, backend, args.page_size, args.concurrency)
+    finally:
+        elapsed: float = time.perf_counter() - started
+        await bot.session.close()
+        await api.close()
+
+    duplicates: int = sum(count - 1 for count in api.delivered.values() if count > 1)
+    print(f"recipients:  {args.recipients} ({api.blocked} blocked)")
+    print(f"sent:        {sender.sent}, failed {sender.failed}, {sender.sent / elapsed:.1f} msg/s")
+    print(f"Bot API:     {len(api.delivered)} chats reached, {duplicates} duplicates")
+    print(f"rate limits: {api.throttled} x 429 from API, {sender.retry_after_hits} RetryAfter handled")
+    if job is not None:
+        print(
+            f"job:         #{job['id']} {job['status']}, cursor {job['cursor']}, "
+            f"sent {job['sent']}, failed {job['failed']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--recipients", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--global-rate", type=float, default=25.0,
+                        help="лимит отправителя, сообщений в секунду")
+    parser.add_argument("--per-chat-rate", type=float, default=1.0)
+    parser.add_argument("--api-global-limit", type=int, default=30,
+                        help="лимит заглушки, сообщений в секунду")
+    parser.add_argument("--blocked-every", type=int, default=50,
+                        help="каждый N-й чат заблокировал бота (0 - никто)")
+    parser.add_argument("--api-latency", type=float, default=0.02)
+    parser.add_argument("--engine", action="store_true",
+                        help="запустить BroadcastEngine (нужен Postgres)")
+    asyncio.run(main(parser.parse_args()))
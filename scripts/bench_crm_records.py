@@ -0,0 +1,150 @@
+"""
+Бенчмарк разбора клиентов AlfaCRM: сырые словари и CustomerRecord.
+
+Синтетический набор клиентов в формате ответа /customer/index (со всеми
+полями, которые CRM отдает, но приложение не использует) режется
+на страницы и разбирается двумя способами:
+- как раньше: json.loads и хранение исходных словарей;
+- как сейчас: services.jsonlib.loads и CustomerRecord.from_crm.
+Выводит время разбора, скорость и память, которую занимают результаты
+(tracemalloc), а также пиковую память при разборе.
+
+    python scripts/bench_crm_records.py --customers 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "api"))
+
+# Обязательные настройки backend; к CRM и БД скрипт не обращается
+for name, value in {
+    "DATABASE_URL": "postgresql+asyncpg://localhost/bench",
+    "ALFACRM_API_KEY": "bench",
+    "ALFACRM_HOSTNAME": "localhost",
+    "ALFACRM_BRANCH_ID": "1",
+    "ALFACRM_EMAIL": "bench@localhost",
+    "TELEGRAM_BOT_TOKEN": "123456:bench",
+    "DIRECTORS_CHAT_ID": "0",
+    "BACKEND_API_TOKEN": "bench"
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.config import settings  # noqa: E402
+from services import jsonlib  # noqa: E402
+from services.records import CustomerRecord  # noqa: E402
+
+
+def synthetic_customer(customer_id: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "id": customer_id,
+        "branch_ids": [1],
+        "teacher_ids": [rng.randint(1, 40)],
+        "name": f"Ученик {customer_id} Иванов",
+        "color": None,
+        "is_study": 1,
+        "study_status_id": 1,
+        "lead_status_id": None,
+        "lead_source_id": rng.randint(1, 10),
+        "assigned_id": rng.randint(1, 20),
+        "legal_type": 1,
+        "legal_name": f"Родитель {customer_id}",
+        "company_id": None,
+        "dob": "12.03.2014",
+        "balance": {
+            "balance": f"{rng.uniform(-5000, 20000):.2f}",
+            "lesson_balance": rng.randint(0, 16),
+            "bonus_balance": rng.randint(0, 300)
+        },
+        "paid_count": rng.randint(0, 100),
+        "paid_till": "30.06.2025",
+        "note": "Комментарий администратора " * rng.randint(0, 4),
+        "e_date": "01.09.2023",
+        "paid_lesson_count": rng.randint(0, 100),
+        "phone": [f"+7900{customer_id:07d}"],
+        "email": [f"parent{customer_id}@example.com"],
+        "web": [],
+        "addr": ["г. Москва, ул. Примерная, д. 1"],
+        "custom_fields": {
+            settings.alfacrm_telegram_field: str(500000000 + customer_id),
+            "school": f"Школа №{rng.randint(1, 300)}",
+            "grade": str(rng.randint(1, 11))
+        },
+        "groups": [
+            {"id": rng.randint(1, 200), "name": f"Группа {rng.randint(1, 200)}"}
+            for _ in range(rng.randint(1, 3))
+        ],
+        "updated_at": "2025-01-15 10:00:00"
+    }
+
+
+def build_pages(customers: int, page_size: int) -> List[bytes]:
+    rng = random.Random(42)
+    items: List[Dict[str, Any]] = [synthetic_customer(i, rng) for i in range(1, customers + 1)]
+    return [
+        json.dumps({
+            "total": customers,
+            "count": len(items[start:start + page_size]),
+            "page": start // page_size,
+            "items": items[start:start + page_size]
+        }, ensure_ascii=False).encode()
+        for start in range(0, customers, page_size)
+    ]
+
+
+def parse_dicts(pages: List[bytes]) -> List[Dict[str, Any]]:
+    # Как было: ответ целиком, словари передаются дальше как есть
+    return [item for page in pages for item in json.loads(page)["items"]]
+
+
+def parse_records(pages: List[bytes]) -> List[CustomerRecord]:
+    return [
+        CustomerRecord.from_crm(item)
+        for page in pages
+        for item in jsonlib.loads(page)["items"]
+    ]
+
+
+def measure(name: str, parse: Callable[[List[bytes]], List[Any]], pages: List[bytes]) -> None:
+    started: float = time.perf_counter()
+    result = parse(pages)
+    elapsed: float = time.perf_counter() - started
+    count: int = len(result)
+    del result
+
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    result = parse(pages)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(
+        f"{name:>14}: {elapsed:6.2f}s, {count / elapsed:8.0f} customers/s, "
+        f"retained {(retained - before) / 2 ** 20:6.1f} MiB "
+        f"({(retained - before) / count:5.0f} B/customer), "
+        f"peak {(peak - before) / 2 ** 20:6.1f} MiB"
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    pages: List[bytes] = build_pages(args.customers, args.page_size)
+    size: int = sum(len(page) for page in pages)
+    print(f"dataset: {args.customers} customers, {len(pages)} pages, {size / 2 ** 20:.1f} MiB JSON")
+    print(f"decoder: {'orjson' if jsonlib.orjson is not None else 'json'}")
+    measure("raw dicts", parse_dicts, pages)
+    measure("CustomerRecord", parse_records, pages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    main(parser.parse_args())
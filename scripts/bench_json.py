@@ -0,0 +1,135 @@
+"""
+Бенчмарк JSON на истории транзакций: стандартный json и orjson.
+
+Кодирование - ответ /finance/history (заголовок и страница транзакций
+в формате TransactionItem), как его отдавал JSONResponse и как отдает
+ORJSONResponse. Декодирование - страница /transaction/index AlfaCRM:
+раньше response.json() (байты -> str -> json.loads), теперь
+jsonlib.loads прямо из байтов.
+
+Выводит время операции и пиковую память (tracemalloc) на операцию.
+
+    python scripts/bench_json.py --transactions 50 --iterations 5000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "api"))
+
+from services import jsonlib  # noqa: E402
+
+CRM_TYPES: List[str] = ["payment", "lesson", "bonus", "correction_in", "correction_out"]
+
+
+def history_response(count: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "focus_group": "Основная группа",
+        "stale": False,
+        "page": 1,
+        "next_cursor": "cDoxOjEw",
+        "prev_cursor": None,
+        "transactions": [
+            {
+                "type": rng.choice(["income", "expense"]),
+                "amount": round(rng.uniform(100, 10000), 2),
+                "currency": "руб.",
+                "description": f"Оплата абонемента за {rng.randint(1, 12)} месяц",
+                "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            }
+            for _ in range(count)
+        ]
+    }
+
+
+def crm_page(count: int, rng: random.Random) -> bytes:
+    return json.dumps({
+        "total": count * 10,
+        "count": count,
+        "page": 0,
+        "items": [
+            {
+                "id": 100000 + index,
+                "branch_id": 1,
+                "customer_id": 4242,
+                "type": rng.choice(CRM_TYPES),
+                "value": f"{rng.uniform(-5000, 10000):.2f}",
+                "currency": "руб.",
+                "comment": "Оплата по QR, чек №" + str(rng.randint(1, 10 ** 6)),
+                "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "pay_account_id": rng.randint(1, 5),
+                "user_id": rng.randint(1, 20),
+                "is_confirmed": 1
+            }
+            for index in range(count)
+        ]
+    }, ensure_ascii=False).encode()
+
+
+def stdlib_dumps(value: Any) -> bytes:
+    # Как JSONResponse в Starlette
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def stdlib_loads(data: bytes) -> Any:
+    # Как httpx.Response.json(): сначала текст, затем разбор
+    return json.loads(data.decode("utf-8"))
+
+
+def measure(fn: Callable[[], Any], iterations: int) -> Tuple[float, float]:
+    """
+    (мкс на операцию, пиковая память на операцию в КиБ)
+    """
+
+    fn()
+    started: float = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_op_us: float = (time.perf_counter() - started) / iterations * 1e6
+
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn()
+    peak: int = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return per_op_us, peak / 1024
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(7)
+    response: Dict[str, Any] = history_response(args.transactions, rng)
+    page: bytes = crm_page(args.transactions, rng)
+    print(f"payloads: response {len(stdlib_dumps(response))} B, CRM page {len(page)} B")
+
+    if jsonlib.orjson is None:
+        print("orjson is not installed: jsonlib falls back to json")
+
+    cases = (
+        ("encode json", lambda: stdlib_dumps(response)),
+        ("encode jsonlib", lambda: jsonlib.dumps(response)),
+        ("decode json", lambda: stdlib_loads(page)),
+        ("decode jsonlib", lambda: jsonlib.loads(page))
+    )
+    for name, fn in cases:
+        per_op_us, peak_kib = measure(fn, args.iterations)
+        print(f"{name:>15}: {per_op_us:8.1f} us/op, peak {peak_kib:7.1f} KiB/op")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--transactions", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=5000)
+    main(parser.parse_args())
@@ -0,0 +1,85 @@
+"""
+Бенчмарк готовых клавиатур и текстов бота (bot/keyboards, bot/texts.py).
+
+Для каждого ответа сравнивается старый путь (ReplyKeyboardBuilder
+и сборка текста на каждый вызов) с переиспользованием объектов,
+созданных при импорте. В обоих случаях разметка сериализуется так же,
+как при отправке, поэтому замер учитывает и работу pydantic.
+Выводит время и объем выделенной памяти (tracemalloc) на один ответ.
+
+    python scripts/bench_static_payloads.py --iterations 20000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "bot"))
+
+from aiogram.types import ReplyKeyboardMarkup  # noqa: E402
+from aiogram.utils.keyboard import ReplyKeyboardBuilder  # noqa: E402
+
+from keyboards.main_menu_keyboard import MAIN_MENU, MAIN_MENU_BUTTONS  # noqa: E402
+from texts import BOT_RULES_TITLE, format_rules  # noqa: E402
+
+RULES_TEXT: str = "\n".join(
+    f"{index}. Пункт правил школы номер {index}" for index in range(1, 30)
+)
+
+
+def build_menu_per_call() -> ReplyKeyboardMarkup:
+    # Так клавиатура строилась до переноса в модуль
+    kb = ReplyKeyboardBuilder()
+    for text in MAIN_MENU_BUTTONS:
+        kb.button(text=text)
+    kb.adjust(3, 3, 1)
+    return kb.as_markup(resize_keyboard=True)
+
+
+def old_reply() -> Tuple[str, ReplyKeyboardMarkup, str]:
+    text: str = f"📋 <b>Правила использования бота</b>\n\n{RULES_TEXT}"
+    markup: ReplyKeyboardMarkup = build_menu_per_call()
+    return text, markup, markup.model_dump_json(exclude_none=True)
+
+
+def new_reply() -> Tuple[str, ReplyKeyboardMarkup, str]:
+    text: str = format_rules(BOT_RULES_TITLE, RULES_TEXT)
+    return text, MAIN_MENU, MAIN_MENU.model_dump_json(exclude_none=True)
+
+
+def measure(fn: Callable[[], object], iterations: int) -> Tuple[float, float]:
+    """
+    (мкс на вызов, байт выделено на вызов)
+    """
+
+    fn()
+    started: float = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call_us: float = (time.perf_counter() - started) / iterations * 1e6
+
+    # Память меряется отдельно: tracemalloc сильно замедляет вызовы.
+    # Результаты удерживаются, как объекты ответа на время отправки
+    sample: int = min(iterations, 2000)
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    results = [fn() for _ in range(sample)]
+    allocated: int = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del results
+    return per_call_us, allocated / sample
+
+
+def main(args: argparse.Namespace) -> None:
+    for name, fn in (("per call", old_reply), ("prebuilt", new_reply)):
+        per_call_us, per_call_bytes = measure(fn, args.iterations)
+        print(f"{name:>9}: {per_call_us:7.1f} us/reply, {per_call_bytes:8.0f} B allocated/reply")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    main(parser.parse_args())
@@ -0,0 +1,72 @@
+"""
+Проверка классификации транзакций для финансовых сводок на фикстуре.
+
+Транзакции из fixtures/finance_transactions.json разбираются через
+TransactionRecord и сворачиваются по месяцам так же, как это делают
+finance_monthly и crud.finance._monthly_totals. Итоги сравниваются
+с ожидаемыми из фикстуры.
+
+    python scripts/check_finance_rollup.py
+"""
+import json
+import os
+import sys
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "api"))
+
+# Обязательные настройки backend; к CRM и БД скрипт не обращается
+for name, value in {
+    "DATABASE_URL": "postgresql+asyncpg://localhost/check",
+    "ALFACRM_API_KEY": "check",
+    "ALFACRM_HOSTNAME": "localhost",
+    "ALFACRM_BRANCH_ID": "1",
+    "ALFACRM_EMAIL": "check@localhost",
+    "TELEGRAM_BOT_TOKEN": "123456:check",
+    "DIRECTORS_CHAT_ID": "0",
+    "BACKEND_API_TOKEN": "check"
+}.items():
+    os.environ.setdefault(name, value)
+# Типы в фикстуре рассчитаны на этот префикс
+os.environ["CYBERON_CRM_TYPE_PREFIX"] = "bonus"
+
+from services.records import TransactionRecord, is_cyberon_type  # noqa: E402
+
+FIXTURE = ROOT / "fixtures" / "finance_transactions.json"
+
+
+def rollup(transactions) -> Dict[str, Dict[str, Decimal]]:
+    totals: Dict[str, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+    for item in transactions:
+        record = TransactionRecord.from_crm(item)
+        month: str = record.date[:7]
+        if is_cyberon_type(record.crm_type):
+            column = "cyberons_earned" if record.type == "income" else "cyberons_spent"
+        else:
+            column = "income" if record.type == "income" else "expense"
+        totals[month][column] += record.amount
+    return totals
+
+
+def main() -> int:
+    fixture = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    totals = rollup(fixture["transactions"])
+
+    failed: int = 0
+    for month, expected in fixture["expected"].items():
+        for column, value in expected.items():
+            actual = totals[month][column]
+            if actual != Decimal(value):
+                failed += 1
+                print(f"{month} {column}: expected {value}, got {actual}")
+
+    print("OK" if not failed else f"{failed} mismatches")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Нагрузочный тест webhook-режима бота на локальной заглушке Bot API.
+
+Поднимает WebhookServer из bot/webhook.py с UserQueueMiddleware
+и простым хендлером, который отвечает на каждое сообщение. Бот ходит
+в локальную заглушку Bot API (с настраиваемой задержкой), поэтому
+Telegram не нужен. Обновления отправляются на webhook с заданной
+частотой: из файла с записанными обновлениями (JSON Lines, по одному
+объекту Update на строку) или синтетические.
+
+Выводит фактическую частоту отправки, время ответа webhook
+(p50/p95/p99), число отказов 503 и скорость обработки хендлерами.
+
+    python scripts/loadtest_webhook.py --rate 500 --duration 20
+    python scripts/loadtest_webhook.py --updates recorded.jsonl --rate 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "bot"))
+
+# Обязательные настройки бота; реальные значения для теста не нужны
+for name, value in {
+    "TELEGRAM_BOT_TOKEN": "123456:loadtest",
+    "TELEGRAM_ADMINS": "[]",
+    "DIRECTORS_CHAT_ID": "0",
+    "BACKEND_API_URL": "http://127.0.0.1:9/",
+    "BACKEND_API_TOKEN": "loadtest",
+    "DATABASE_URL": "postgresql+asyncpg://localhost/loadtest",
+    "ALFACRM_API_KEY": "loadtest",
+    "ALFACRM_BASE_URL": "http://127.0.0.1:9/",
+    "PLACEHOLDER_QR_URL": "http://127.0.0.1:9/qr.png"
+}.items():
+    os.environ.setdefault(name, value)
+
+from aiogram import Bot, Dispatcher, Router  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+from aiogram.types import Message  # noqa: E402
+from aiohttp import ClientSession, web  # noqa: E402
+
+from keyboards.main_menu_keyboard import MAIN_MENU_BUTTONS, MAIN_MENU_TEXTS  # noqa: E402
+from middlewares import UserQueueMiddleware  # noqa: E402
+from webhook import SECRET_HEADER, WebhookServer  # noqa: E402
+
+SECRET = "loadtest-secret"
+TOKEN = os.environ["TELEGRAM_BOT_TOKEN"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], share: float) -> float:
+    if not values:
+        return 0.0
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class FakeBotAPI:
+    """
+    Заглушка Bot API: отвечает на любой метод, считает sendMessage
+    """
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+        self._runner: web.AppRunner = web.AppRunner(web.Application())
+        self.url: str = ""
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method: str = request.match_info["method"]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        data = await request.post()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        result: Any = True
+        if method.lower() == "sendmessage":
+            result = {
+                "message_id": self.calls[method],
+                "date": int(time.time()),
+                "chat": {"id": int(data.get("chat_id", 0)), "type": "private"},
+                "text": data.get("text", "")
+            }
+        return web.json_response({"ok": True, "result": result})
+
+    async def start(self) -> None:
+        self._runner.app.router.add_post("/bot{token}/{method}", self.handle)
+        await self._runner.setup()
+        port: int = free_port()
+        await web.TCPSite(self._runner, "127.0.0.1", port).start()
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def close(self) -> None:
+        await self._runner.cleanup()
+
+
+def synthetic_updates(users: int) -> Iterator[Dict[str, Any]]:
+    update_id: int = 0
+    while True:
+        update_id += 1
+        user_id: int = 100000 + update_id % users
+        yield {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "Parent"},
+                "text": MAIN_MENU_BUTTONS[update_id % len(MAIN_MENU_BUTTONS)]
+            }
+        }
+
+
+def recorded_updates(path: Path) -> Iterator[Dict[str, Any]]:
+    # Записанные обновления повторяются по кругу с новыми update_id,
+    # иначе middleware отбросит их как повторную доставку
+    records: List[Dict[str, Any]] = [
+        json.loads(line)
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+    update_id: int = 0
+    while True:
+        for record in records:
+            update_id += 1
+            yield {**record, "update_id": update_id}
+
+
+def build_dispatcher() -> Dispatcher:
+    router = Router()
+
+    @router.message()
+    async def reply(message: Message) -> None:
+        await message.answer(f"OK: {message.text}")
+
+    dp = Dispatcher()
+    dp.update.outer_middleware(UserQueueMiddleware(button_texts=MAIN_MENU_TEXTS))
+    dp.include_router(router)
+    return dp
+
+
+async def main(args: argparse.Namespace) -> None:
+    api = FakeBotAPI(latency=args.api_latency)
+    await api.start()
+
+    bot = Bot(
+        token=TOKEN,
+        session=AiohttpSession(api=TelegramAPIServer.from_base(api.url))
+    )
+    dp = build_dispatcher()
+    server = WebhookServer(
+        dp,
+        bot,
+        path="/webhook",
+        secret=SECRET,
+        workers=args.workers,
+        queue_size=args.queue_size
+    )
+    port: int = free_port()
+    base_url: str = f"http://127.0.0.1:{port}"
+    await server.start(host="127.0.0.1", port=port, base_url=base_url)
+
+    updates: Iterator[Dict[str, Any]] = (
+        recorded_updates(Path(args.updates))
+        if args.updates else synthetic_updates(args.users)
+    )
+    total: int = int(args.rate * args.duration)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+
+    async with ClientSession(headers={SECRET_HEADER: SECRET}) as http:
+        async def post(update: Dict[str, Any]) -> None:
+            started: float = time.perf_counter()
+            async with http.post(base_url + "/webhook", json=update) as response:
+                await response.read()
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+        # Отправка по расписанию: i-е обновление уходит в момент i / rate
+        tasks: List[asyncio.Task] = []
+        started: float = time.perf_counter()
+        for index in range(total):
+            delay: float = started + index / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(post(next(updates))))
+        await asyncio.gather(*tasks)
+        sent_elapsed: float = time.perf_counter() - started
+
+        await server.queue.join()
+        processed_elapsed: float = time.perf_counter() - started
+
+    stats: Dict[str, Any] = server.stats()
+    await server.stop()
+    await bot.session.close()
+    await api.close()
+
+    print(f"sent:       {total} updates, {total / sent_elapsed:.0f}/s (target {args.rate:.0f}/s)")
+    print(f"statuses:   {dict(sorted(statuses.items()))}")
+    print(
+        f"ack ms:     p50 {percentile(latencies, 0.5) * 1000:.1f}, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.1f}, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f}"
+    )
+    print(
+        f"processed:  {stats['processed']} ({stats['failed']} failed), "
+        f"{stats['processed'] / processed_elapsed:.0f}/s"
+    )
+    print(f"Bot API:    {api.calls.get('sendMessage', 0)} sendMessage calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=200.0, help="обновлений в секунду")
+    parser.add_argument("--duration", type=float, default=10.0, help="секунд")
+    parser.add_argument("--updates", help="файл с записанными обновлениями (JSON Lines)")
+    parser.add_argument("--users", type=int, default=1000, help="пользователей в синтетике")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--api-latency", type=float, default=0.05,
+                        help="задержка ответа заглушки Bot API, сек.")
+    asyncio.run(main(parser.parse_args()))